@@ -2,12 +2,17 @@
 
 
 from functools import partial
+from typing import TYPE_CHECKING
 
-import build123d as b
-
+from someline import lazy_import
 from someline.someline import make_box, make_handle, make_wall_cutout
 from someline.util import Project
 
+if TYPE_CHECKING:
+    import build123d as b
+else:
+    b = lazy_import("build123d")
+
 WIDTH = 30.0
 HEIGHT = 19.2
 
@@ -145,11 +150,10 @@ def make_cap():
     return part.part
 
 
-project = Project("someline-15", default_color=b.Color(0xFF6A13))
+project = Project("someline-15", default_color=0xFF6A13)
 project.add("U0", partial(make, units=1, width=25.0))
 
-for i in range(1, 6):
-    project.add(f"U{i}", partial(make, units=i))
+project.add_family("U{units}", make, units=range(1, 6))
 
 project.add("cap", make_cap)
 
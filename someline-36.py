@@ -2,17 +2,24 @@
 
 
 from functools import partial
+from typing import TYPE_CHECKING
 
-import build123d as b
-
+from someline import lazy_import
 from someline.someline import (
+    Features,
     make_handle,
     make_loft_box,
     make_wall_cutout,
     make_wall_cutout_pocket,
+    memoize,
 )
 from someline.util import Project
 
+if TYPE_CHECKING:
+    import build123d as b
+else:
+    b = lazy_import("build123d")
+
 WIDTH = 41.2
 HEIGHT = 33.7
 
@@ -44,7 +51,8 @@ def make_s36_cutouts():
     )
 
 
-def b_cap_hinge_cutout(length, half=False):
+@memoize
+def make_hinge_pin_cutout():
     with b.BuildPart(mode=b.Mode.PRIVATE) as cutout:
         with b.BuildSketch(b.Plane.YZ):
             with b.BuildLine():
@@ -64,15 +72,21 @@ def b_cap_hinge_cutout(length, half=False):
             radius=(LIT_PIN_BOTW / 3),
         )
 
-    with b.Locations((0.0, LIT_PIN_DY, HEIGHT)):
-        b.add(cutout, mode=b.Mode.SUBTRACT)
-    with b.Locations((0.0, WIDTH - LIT_PIN_DY, HEIGHT)):
-        b.add(cutout, mode=b.Mode.SUBTRACT)
+    return cutout.part
+
+
+def b_cap_hinge_cutout(length, half=False):
+    cutout = make_hinge_pin_cutout()
+
+    locs = [(0.0, LIT_PIN_DY, HEIGHT), (0.0, WIDTH - LIT_PIN_DY, HEIGHT)]
     if not half:
-        with b.Locations((length - LIT_PIN_LENGTH, LIT_PIN_DY, HEIGHT)):
-            b.add(cutout, mode=b.Mode.SUBTRACT)
-        with b.Locations((length - LIT_PIN_LENGTH, WIDTH - LIT_PIN_DY, HEIGHT)):
-            b.add(cutout, mode=b.Mode.SUBTRACT)
+        locs += [
+            (length - LIT_PIN_LENGTH, LIT_PIN_DY, HEIGHT),
+            (length - LIT_PIN_LENGTH, WIDTH - LIT_PIN_DY, HEIGHT),
+        ]
+
+    with b.Locations(*locs):
+        b.add(cutout, mode=b.Mode.SUBTRACT)
 
 
 def make(units: int):
@@ -118,14 +132,18 @@ def make(units: int):
                 height=24.1,
             )
 
-            with b.GridLocations(OUTER_ROW_SIZE * units, 0, 2, 1, align=b.Align.MIN):
-                b.add(pocket, mode=b.Mode.SUBTRACT)
+            features = Features()
+            with b.GridLocations(
+                OUTER_ROW_SIZE * units, 0, 2, 1, align=b.Align.MIN
+            ) as locs:
+                features.add(locs, pocket=pocket)
 
             with b.Locations((0.0, WIDTH, 0.0)):
                 with b.GridLocations(
                     OUTER_ROW_SIZE * units, 0, 2, 1, align=b.Align.MIN
-                ):
-                    b.add(pocket, mode=b.Mode.SUBTRACT, rotation=(0.0, 0.0, 180.0))
+                ) as locs:
+                    features.add(locs, pocket=pocket, rotation=(0.0, 0.0, 180.0))
+            features.apply()
 
     return part.part
 
@@ -190,20 +208,20 @@ def make_cutout_box(units: int):
                     INNER_ROW_SIZE, 0, units - 1, 1, align=b.Align.MIN
                 )
 
+            features = Features()
             for loc in locs:
-                with b.Locations(loc):
+                with b.Locations(loc) as back:
                     # Always add wall cutouts on back side
-                    b.add(pad, rotation=(0, 0, 180.0))
-                    b.add(pocket, mode=b.Mode.SUBTRACT, rotation=(0, 0, 180.0))
+                    features.add(back, pad, pocket, rotation=(0, 0, 180.0))
 
                     # Add wall cutouts on front side only if they are not in
                     # the cutout area for the cap hinges:
                     if loc.position.X < (length / 2 - 15) or loc.position.X > (
                         length / 2 + 15
                     ):
-                        with b.Locations((0.0, -WIDTH, 0.0)):
-                            b.add(pad)
-                            b.add(pocket, mode=b.Mode.SUBTRACT)
+                        with b.Locations((0.0, -WIDTH, 0.0)) as front:
+                            features.add(front, pad, pocket)
+            features.apply()
 
         b.add(box.part)
         b_cap_hinge_cutout(length)
@@ -264,20 +282,22 @@ def make_half_cutout_box(units: int, flip=False):
 
             pad, pocket = make_s36_cutouts()
 
+            features = Features()
             with b.Locations((OUTER_ROW_SIZE, WIDTH, 0.0)):
-                with b.GridLocations(INNER_ROW_SIZE, 0, units, 1, align=b.Align.MIN):
+                with b.GridLocations(
+                    INNER_ROW_SIZE, 0, units, 1, align=b.Align.MIN
+                ) as back:
                     # Always add wall cutouts on back side
-                    b.add(pad, rotation=(0, 0, 180.0))
-                    b.add(pocket, mode=b.Mode.SUBTRACT, rotation=(0, 0, 180.0))
+                    features.add(back, pad, pocket, rotation=(0, 0, 180.0))
 
             if units > 1:
                 # Add one less cutout on front side
                 with b.Locations((OUTER_ROW_SIZE, 0, 0.0)):
                     with b.GridLocations(
                         INNER_ROW_SIZE, 0, units - 1, 1, align=b.Align.MIN
-                    ):
-                        b.add(pad)
-                        b.add(pocket, mode=b.Mode.SUBTRACT)
+                    ) as front:
+                        features.add(front, pad, pocket)
+            features.apply()
 
         b.add(box.part)
         b_cap_hinge_cutout(length, half=True)
@@ -290,15 +310,16 @@ def make_half_cutout_box(units: int, flip=False):
 
 project = Project(
     "someline-36",
-    default_color=b.Color(0xFF6A13),
+    default_color=0xFF6A13,
     grid=(INNER_ROW_SIZE, WIDTH + 4),
 )
 
-for i in range(1, 7):
-    project.add(f"U{i}", partial(make, units=i), grid=(0, i))
-
-for i in range(7, 11):
-    project.add(f"U{i}", partial(make, units=i), grid=(6, i - 6))
+project.add_family(
+    "U{units}",
+    make,
+    units=range(1, 11),
+    grid=lambda units: (0, units) if units < 7 else (6, units - 6),
+)
 
 project.add("A1", partial(make_half_cutout_box, units=1), grid=(6, 5))
 project.add("A2", partial(make_half_cutout_box, units=2), grid=(8, 5))
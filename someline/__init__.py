@@ -0,0 +1,25 @@
+# pylint: disable=missing-docstring
+
+
+import importlib.util
+import sys
+
+
+def lazy_import(name: str):
+    """
+    Import a module on first attribute access. Project scripts import
+    build123d lazily so that commands not building any geometry, such as
+    `export --list`, do not pay for loading OCCT.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.loader is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+
+    spec.loader = importlib.util.LazyLoader(spec.loader)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,6 @@
+# pylint: disable=missing-docstring
+
+
+from someline.util import main
+
+main()
@@ -0,0 +1,171 @@
+# pylint: disable=missing-docstring
+"""
+Benchmarks for the geometry helpers and the models of all project scripts.
+
+    python -m someline.bench --output bench.json
+    python -m someline.bench --baseline bench.json
+
+Results are stored as JSON and compared against a baseline to flag
+regressions, e.g. after a build123d update.
+"""
+
+import glob
+import json
+import os
+import platform
+import runpy
+import sys
+import time
+from fnmatch import fnmatch
+from functools import partial
+
+import build123d as b
+import click
+import OCP
+
+from someline import someline
+from someline.util import find_projects
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LENGTHS = (25.0, 50.0, 100.0, 200.0)
+HEIGHTS = (12.5, 24.1)
+
+
+def _helpers():
+    # Helpers are memoized and call each other, so all caches are cleared
+    # before each run to measure actual construction time.
+    def box(fn, length, **kwargs):
+        def run():
+            with fn(length, 30.0, 19.2, **kwargs):
+                pass
+
+        return _cold(run)
+
+    for length in LENGTHS:
+        yield f"make_box[{length:g}]", box(someline.make_box, length)
+        yield f"make_loft_box[{length:g}]", box(someline.make_loft_box, length)
+        yield (
+            f"make_handle[{length:g}]",
+            _cold(partial(someline.make_handle, length)),
+        )
+
+    kwargs = {"outer_width": 9.0, "inner_width": 6.0, "depth": 3.0}
+    for height in HEIGHTS:
+        yield (
+            f"make_wall_cutout[{height:g}]",
+            _cold(partial(someline.make_wall_cutout, height=height, **kwargs)),
+        )
+        yield (
+            f"make_wall_cutout_pocket[{height:g}]",
+            _cold(partial(someline.make_wall_cutout_pocket, height=height, **kwargs)),
+        )
+
+
+def _models():
+    sys.path.insert(0, ROOT)
+
+    for script in sorted(glob.glob(os.path.join(ROOT, "*.py"))):
+        namespace = runpy.run_path(script, run_name="__bench__")
+        for project in find_projects(namespace):
+            for model in project:
+                yield f"{project.name}/{model.name}", _cold(model._fn, namespace)
+
+
+def _cold(fn, namespace: dict | None = None):
+    # Clear memoized helpers, of someline and of the script defining the
+    # model, so each benchmark is measured as built on its own.
+    def run():
+        _clear_caches(vars(someline))
+        if namespace:
+            _clear_caches(namespace)
+        fn()
+
+    return run
+
+
+def _clear_caches(namespace: dict):
+    for value in namespace.values():
+        if hasattr(value, "cache_clear"):
+            value.cache_clear()
+
+
+def _measure(fn, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _compare(results: dict, baseline: dict, threshold: float):
+    regressions = 0
+    for name, seconds in results.items():
+        if name not in baseline:
+            continue
+
+        base = baseline[name]
+        change = (seconds - base) / base if base else 0.0
+
+        # Ignore changes below a few milliseconds as noise
+        mark = ""
+        if change > threshold and seconds - base > 0.005:
+            mark = "  REGRESSION"
+            regressions += 1
+
+        click.echo(f"{name:<32} {base:>8.3f}s {seconds:>8.3f}s {change:>+8.1%}{mark}")
+
+    return regressions
+
+
+@click.command()
+@click.option("-k", "pattern", default="*", help="Only run matching benchmarks")
+@click.option("--repeat", type=click.IntRange(min=1), default=1, show_default=True)
+@click.option("--output", type=click.Path(dir_okay=False))
+@click.option("--baseline", type=click.Path(dir_okay=False))
+@click.option("--threshold", type=float, default=0.2, show_default=True)
+def main(
+    pattern: str,
+    repeat: int,
+    output: str | None,
+    baseline: str | None,
+    threshold: float,
+):
+    benchmarks = [*_helpers(), *_models()]
+
+    # Warm up OCCT so the first benchmark is not penalized
+    benchmarks[0][1]()
+
+    results = {}
+    for name, fn in benchmarks:
+        if fnmatch(name, pattern):
+            results[name] = _measure(fn, repeat)
+            click.echo(f"{name:<32} {results[name]:>8.3f}s", err=True)
+
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "meta": {
+                        "build123d": b.__version__,
+                        "OCP": OCP.__version__,
+                        "python": platform.python_version(),
+                        "machine": platform.machine(),
+                    },
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+            f.write("\n")
+
+    if baseline:
+        with open(baseline, encoding="utf-8") as f:
+            regressions = _compare(results, json.load(f)["results"], threshold)
+        if regressions:
+            raise click.ClickException(f"{regressions} benchmark(s) regressed")
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=E1120
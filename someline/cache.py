@@ -0,0 +1,223 @@
+# pylint: disable=missing-docstring
+
+
+import hashlib
+import importlib.metadata
+import inspect
+import os
+import re
+import tempfile
+import types
+import uuid
+from collections import Counter
+from functools import cache, partial
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from build123d import Part
+
+# Plain values referenced by model functions, e.g. dimension constants,
+# are part of the fingerprint.
+_VALUE_TYPES = (int, float, str, bool, tuple, type(None))
+
+# Default object representations contain memory addresses, which differ
+# between processes.
+_ADDRESS = re.compile(r" at 0x[0-9a-fA-F]+")
+
+
+def fingerprint(fn) -> str:
+    """
+    Return a hash of a model function's source code, its partial arguments,
+    and the source of all project and `someline` functions and constants it
+    references, directly or indirectly, including default arguments and
+    closures.
+    """
+    h = hashlib.sha256(_versions().encode())
+    _hash_callable(h, fn, set())
+    return h.hexdigest()
+
+
+@cache
+def _versions():
+    # Read versions from package metadata to not import OCCT. The OCP
+    # module is provided by different distributions, e.g. cadquery-ocp.
+    dists = importlib.metadata.packages_distributions()
+    return ";".join(
+        f"{dist}={importlib.metadata.version(dist)}"
+        for dist in sorted({"build123d", *dists.get("OCP", [])})
+    )
+
+
+def _hash_callable(h, fn, seen: set):
+    if isinstance(fn, partial):
+        h.update(repr((fn.args, sorted(fn.keywords.items()))).encode())
+        fn = fn.func
+
+    fn = inspect.unwrap(fn)
+    if not isinstance(fn, types.FunctionType) or fn.__code__ in seen:
+        return
+
+    seen.add(fn.__code__)
+
+    try:
+        h.update(inspect.getsource(fn).encode())
+    except OSError:
+        h.update(fn.__code__.co_code)
+
+    # Default arguments and closures are hashed like referenced globals,
+    # e.g. `def make(units, width=WIDTH)` with a changed `WIDTH`.
+    for i, value in enumerate(fn.__defaults__ or ()):
+        _hash_value(h, fn, f"__defaults__[{i}]", value, seen)
+    for name, value in sorted((fn.__kwdefaults__ or {}).items()):
+        _hash_value(h, fn, f"__kwdefaults__[{name}]", value, seen)
+    for name, cell in zip(fn.__code__.co_freevars, fn.__closure__ or ()):
+        try:
+            value = cell.cell_contents
+        except ValueError:
+            continue
+        _hash_value(h, fn, name, value, seen)
+
+    for name in sorted(_global_names(fn.__code__)):
+        if name in fn.__globals__:
+            _hash_value(h, fn, name, fn.__globals__[name], seen)
+
+
+def _hash_value(h, fn, name: str, value, seen: set):
+    # Checking modules first avoids loading lazily imported modules.
+    if isinstance(value, types.ModuleType):
+        return
+    if isinstance(value, _VALUE_TYPES):
+        h.update(f"{name}={value!r};".encode())
+    elif isinstance(value, partial) or _is_project_function(fn, value):
+        _hash_callable(h, value, seen)
+    elif isinstance(value, (type, types.FunctionType, types.BuiltinFunctionType)):
+        # Classes and functions of other packages, e.g. build123d, are
+        # covered by their package versions.
+        module = getattr(value, "__module__", None) or ""
+        if _is_project_module(fn, module):
+            try:
+                h.update(inspect.getsource(value).encode())
+            except OSError:
+                h.update(f"{name}={module}.{value.__qualname__};".encode())
+        else:
+            h.update(f"{name}={module}.{value.__qualname__};".encode())
+    else:
+        # Other values, e.g. lists or colors, are hashed by their repr. If it
+        # is not stable, the fingerprint is unique to this call so that the
+        # model is never read from the cache.
+        text = repr(value)
+        if _ADDRESS.search(text):
+            text = uuid.uuid4().hex
+        h.update(f"{name}={text};".encode())
+
+
+def _global_names(code: types.CodeType):
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= _global_names(const)
+    return names
+
+
+def _is_project_function(fn, value) -> bool:
+    value = inspect.unwrap(value) if callable(value) else value
+    if not isinstance(value, types.FunctionType):
+        return False
+
+    return _is_project_module(fn, value.__module__)
+
+
+def _is_project_module(fn, module: str) -> bool:
+    return module == fn.__module__ or module.startswith("someline")
+
+
+class PartCache:
+    """
+    Persistent cache of built parts stored as binary BREP files, keyed by a
+    model fingerprint. The least recently used files are evicted when the
+    cache grows beyond `max_size` bytes.
+
+    Parts read from the cache can differ from fresh builds in the last bits
+    of located geometry, see `someline.step.normalize`.
+    """
+
+    def __init__(self, directory: str, max_size: int = 1024 * 2**20):
+        self.directory = directory
+        self.max_size = max_size
+        self.stats = Counter()
+
+    def _path(self, key: str):
+        return os.path.join(self.directory, key[:2], f"{key}.brep")
+
+    def get(self, key: str) -> "Part | None":
+        from build123d import Part  # pylint: disable=C0415
+        from OCP.BinTools import BinTools  # pylint: disable=C0415
+        from OCP.TopoDS import TopoDS_Shape  # pylint: disable=C0415
+
+        path = self._path(key)
+        shape = TopoDS_Shape()
+
+        try:
+            # Touch on use to evict least recently used files first.
+            os.utime(path)
+            BinTools.Read_s(shape, path)
+        except FileNotFoundError:
+            pass
+
+        if shape.IsNull():
+            self.stats["misses"] += 1
+            return None
+
+        self.stats["hits"] += 1
+        return Part(shape)
+
+    def put(self, key: str, part: "Part"):
+        from OCP.BinTools import BinTools, BinTools_FormatVersion  # pylint: disable=C0415
+
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temporary file first so concurrent readers never see
+        # partially written files.
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        os.close(fd)
+        BinTools.Write_s(
+            part.wrapped,
+            tmp,
+            False,
+            False,
+            BinTools_FormatVersion.BinTools_FormatVersion_CURRENT,
+        )
+        os.replace(tmp, path)
+
+        self.evict()
+
+    def evict(self):
+        files = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.endswith(".brep"):
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    files.append((st.st_mtime, st.st_size, path))
+
+        size = sum(f[1] for f in files)
+        for _, fsize, path in sorted(files):
+            if size <= self.max_size:
+                break
+
+            try:
+                os.remove(path)
+                self.stats["evictions"] += 1
+            except FileNotFoundError:
+                pass
+            size -= fsize
+
+    def summary(self):
+        return (
+            f"cache: {self.stats['hits']} hits, {self.stats['misses']} misses, "
+            f"{self.stats['evictions']} evictions"
+        )
@@ -0,0 +1,38 @@
+# pylint: disable=missing-docstring
+
+
+import contextlib
+import gzip
+import os
+from typing import BinaryIO, Iterator
+
+# File extensions of supported compression formats
+COMPRESSIONS = ("gz", "zst")
+
+
+@contextlib.contextmanager
+def open_output(file: str) -> Iterator[BinaryIO]:
+    """
+    Open a file for binary writing, compressing written data on the fly if
+    the file name ends with `.gz` or `.zst`.
+
+    Compressed files do not store a name or modification time, so that
+    output is byte-stable like uncompressed exports.
+    """
+    ext = os.path.splitext(file)[1]
+
+    if ext == ".zst":
+        try:
+            from compression import zstd  # pylint: disable=C0415
+        except ImportError as e:
+            raise RuntimeError("Python is built without zstd support") from e
+
+    with open(file, "wb") as f:
+        if ext == ".gz":
+            with gzip.GzipFile(filename="", mode="wb", fileobj=f, mtime=0) as gz:
+                yield gz
+        elif ext == ".zst":
+            with zstd.ZstdFile(f, "wb") as zf:
+                yield zf
+        else:
+            yield f
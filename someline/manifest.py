@@ -0,0 +1,58 @@
+# pylint: disable=missing-docstring
+
+
+import hashlib
+import json
+import os
+
+
+def file_hash(file: str) -> str:
+    h = hashlib.sha256()
+    with open(file, "rb") as f:
+        while chunk := f.read(2**20):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class Manifest:
+    """
+    Record of exported files, mapping each export task to the hash of its
+    inputs and the hashes of the files it has written. Tasks whose inputs
+    and outputs are unchanged since the last export can be skipped.
+    """
+
+    def __init__(self, file: str, directory: str):
+        self.file = file
+        self.directory = directory
+        self.entries: dict[str, dict] = {}
+
+        if os.path.exists(file):
+            with open(file, encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    def fresh(self, task: str, key: str) -> bool:
+        entry = self.entries.get(task)
+        if not entry or entry["input"] != key:
+            return False
+
+        for name, digest in entry["outputs"].items():
+            file = os.path.join(self.directory, name)
+            if not os.path.exists(file) or file_hash(file) != digest:
+                return False
+
+        return True
+
+    def update(self, task: str, key: str, files: list[str]):
+        self.entries[task] = {
+            "input": key,
+            "outputs": {
+                os.path.relpath(file, self.directory): file_hash(file) for file in files
+            },
+        }
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.file) or ".", exist_ok=True)
+        with open(f"{self.file}.tmp", "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
+            f.write("\n")
+        os.replace(f"{self.file}.tmp", self.file)
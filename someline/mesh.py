@@ -0,0 +1,341 @@
+# pylint: disable=missing-docstring
+
+
+import json
+import struct
+import zipfile
+from typing import Iterable
+from xml.sax.saxutils import quoteattr
+
+import numpy as np
+
+from someline.files import open_output
+
+# Binary STL header as written by OCCT, kept for byte-identical output
+STL_HEADER = b"STL Exported by Open CASCADE Technology [dev.opencascade.org]"
+
+STL_DTYPE = np.dtype(
+    [("normal", "<f4", (3,)), ("vertices", "<f4", (3, 3)), ("attr", "<u2")]
+)
+
+_3MF_CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+ <Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+ <Default Extension="model" ContentType="application/vnd.ms-package.3dmanufacturing-3dmodel+xml"/>
+</Types>
+"""
+
+_3MF_RELS = """<?xml version="1.0" encoding="UTF-8"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+ <Relationship Target="/3D/3dmodel.model" Id="rel0" Type="http://schemas.microsoft.com/3dmanufacturing/2013/01/3dmodel"/>
+</Relationships>
+"""
+
+_3MF_MODEL = """<?xml version="1.0" encoding="UTF-8"?>
+<model unit="millimeter" xml:lang="en-US" xmlns="http://schemas.microsoft.com/3dmanufacturing/core/2015/02">
+"""
+
+
+class Mesh:
+    """
+    Triangulation of a shape as vertex coordinates and triangle vertex
+    indices, with the tolerances it was created with.
+    """
+
+    def __init__(
+        self,
+        vertices: np.ndarray,
+        triangles: np.ndarray,
+        tolerance: tuple[float, float],
+    ):
+        self.vertices = vertices
+        self.triangles = triangles
+        self.tolerance = tolerance
+
+
+def tessellate(shape, tolerance: float, angular_tolerance: float) -> Mesh:
+    """
+    Triangulate a shape like `build123d.export_stl` does. The triangulation
+    is stored on the shape's faces too, where viewers like `ocp_vscode`
+    reuse it instead of meshing again.
+    """
+    # pylint: disable=C0415
+    from OCP.BRep import BRep_Tool
+    from OCP.BRepMesh import BRepMesh_IncrementalMesh
+    from OCP.BRepTools import BRepTools
+    from OCP.TopAbs import TopAbs_FACE, TopAbs_REVERSED
+    from OCP.TopExp import TopExp_Explorer
+    from OCP.TopLoc import TopLoc_Location
+    from OCP.TopoDS import TopoDS
+
+    # Remove existing, e.g. finer, triangulations to honor the tolerance.
+    BRepTools.Clean_s(shape.wrapped)
+    BRepMesh_IncrementalMesh(shape.wrapped, tolerance, True, angular_tolerance, True)
+
+    vertices = []
+    triangles = []
+    offset = 0
+
+    explorer = TopExp_Explorer(shape.wrapped, TopAbs_FACE)
+    while explorer.More():
+        face = TopoDS.Face_s(explorer.Current())
+        explorer.Next()
+
+        loc = TopLoc_Location()
+        poly = BRep_Tool.Triangulation_s(face, loc)
+        if poly is None:
+            continue
+
+        nodes = range(1, poly.NbNodes() + 1)
+        if loc.IsIdentity():
+            vertices.extend(poly.Node(i).Coord() for i in nodes)
+        else:
+            trsf = loc.Transformation()
+            vertices.extend(poly.Node(i).Transformed(trsf).Coord() for i in nodes)
+
+        tris = np.array(
+            [poly.Triangle(i).Get() for i in range(1, poly.NbTriangles() + 1)],
+            dtype=np.uint32,
+        ).reshape(-1, 3)
+        if face.Orientation() == TopAbs_REVERSED:
+            tris = tris[:, [0, 2, 1]]
+
+        # OCCT indices start at 1
+        triangles.append(tris - 1 + offset)
+        offset += poly.NbNodes()
+
+    return Mesh(
+        np.array(vertices, dtype=np.float64).reshape(-1, 3),
+        np.concatenate(triangles) if triangles else np.empty((0, 3), np.uint32),
+        (tolerance, angular_tolerance),
+    )
+
+
+def write_stl(mesh: Mesh, file: str, chunk_size: int = 2**16):
+    """
+    Write a binary STL file, streamed in chunks of triangles to bound memory
+    use. Normals are computed in double precision like OCCT's writer does,
+    so that output is identical to `export_stl`. Files ending with `.gz` or
+    `.zst` are compressed while writing.
+    """
+    with open_output(file) as f:
+        f.write(STL_HEADER.ljust(80, b"\0"))
+        f.write(np.uint32(len(mesh.triangles)).tobytes())
+
+        for start in range(0, len(mesh.triangles), chunk_size):
+            chunk = mesh.triangles[start : start + chunk_size]
+            f.write(_stl_records(mesh.vertices, chunk).tobytes())
+
+
+def _stl_records(vertices: np.ndarray, triangles: np.ndarray) -> np.ndarray:
+    p1, p2, p3 = (vertices[triangles[:, i]] for i in range(3))
+    a = p2 - p1
+    b = p3 - p1
+
+    normal = np.empty_like(a)
+    normal[:, 0] = a[:, 1] * b[:, 2] - a[:, 2] * b[:, 1]
+    normal[:, 1] = a[:, 2] * b[:, 0] - a[:, 0] * b[:, 2]
+    normal[:, 2] = a[:, 0] * b[:, 1] - a[:, 1] * b[:, 0]
+
+    square = normal[:, 0] ** 2 + normal[:, 1] ** 2 + normal[:, 2] ** 2
+    valid = square > np.finfo(np.float64).tiny
+    normal[valid] /= np.sqrt(square[valid])[:, None]
+    normal[~valid] = 0.0
+
+    records = np.zeros(len(triangles), dtype=STL_DTYPE)
+    records["normal"] = normal
+    records["vertices"][:, 0] = p1
+    records["vertices"][:, 1] = p2
+    records["vertices"][:, 2] = p3
+    return records
+
+
+def write_3mf(
+    file: str,
+    meshes: dict[str, Mesh],
+    items: Iterable[tuple[str, list[list[float]]]],
+):
+    """
+    Write a 3MF file with one object per named mesh and build items placing
+    these objects by 3x4 transformation matrices, so that repeated objects
+    are stored only once.
+    """
+    ids = {name: i for i, name in enumerate(meshes, start=1)}
+
+    # Fixed timestamps keep the archive reproducible.
+    def entry(name: str):
+        info = zipfile.ZipInfo(name, date_time=(1980, 1, 1, 0, 0, 0))
+        info.compress_type = zipfile.ZIP_DEFLATED
+        return info
+
+    with zipfile.ZipFile(file, "w") as zf:
+        zf.writestr(entry("[Content_Types].xml"), _3MF_CONTENT_TYPES)
+        zf.writestr(entry("_rels/.rels"), _3MF_RELS)
+
+        with zf.open(entry("3D/3dmodel.model"), "w") as f:
+            f.write(_3MF_MODEL.encode())
+            f.write(b" <resources>\n")
+            for name, mesh in meshes.items():
+                f.write(
+                    f'  <object id="{ids[name]}" type="model" name={quoteattr(name)}>\n'.encode()
+                )
+                _write_3mf_mesh(f, mesh)
+                f.write(b"  </object>\n")
+            f.write(b" </resources>\n")
+
+            f.write(b" <build>\n")
+            for name, matrix in items:
+                m = np.asarray(matrix, dtype=np.float64)
+                # 3MF transforms apply to row vectors, i.e. are transposed.
+                values = [*m[:, :3].T.flatten(), *m[:, 3]]
+                transform = " ".join(f"{v:.9g}" for v in values)
+                f.write(
+                    f'  <item objectid="{ids[name]}" transform="{transform}"/>\n'.encode()
+                )
+            f.write(b" </build>\n")
+            f.write(b"</model>\n")
+
+
+def _write_3mf_mesh(f, mesh: Mesh, chunk_size: int = 2**14):
+    # Merge vertices shared by adjacent faces, 3MF requires closed meshes
+    # with shared vertices. Drop triangles that collapse when merging.
+    vertices, index = np.unique(mesh.vertices, axis=0, return_inverse=True)
+    triangles = index.reshape(-1)[mesh.triangles]
+    triangles = triangles[
+        (triangles[:, 0] != triangles[:, 1])
+        & (triangles[:, 1] != triangles[:, 2])
+        & (triangles[:, 2] != triangles[:, 0])
+    ]
+
+    f.write(b"   <mesh>\n    <vertices>\n")
+    for start in range(0, len(vertices), chunk_size):
+        f.write(
+            "".join(
+                f'     <vertex x="{x:.9g}" y="{y:.9g}" z="{z:.9g}"/>\n'
+                for x, y, z in vertices[start : start + chunk_size].tolist()
+            ).encode()
+        )
+    f.write(b"    </vertices>\n    <triangles>\n")
+    for start in range(0, len(triangles), chunk_size):
+        f.write(
+            "".join(
+                f'     <triangle v1="{a}" v2="{b}" v3="{c}"/>\n'
+                for a, b, c in triangles[start : start + chunk_size].tolist()
+            ).encode()
+        )
+    f.write(b"    </triangles>\n   </mesh>\n")
+
+
+def write_glb(
+    file: str,
+    meshes: dict[str, Mesh],
+    items: Iterable[tuple[str, list[list[float]]]],
+    colors: dict[str, tuple[float, float, float, float]] | None = None,
+):
+    """
+    Write a binary glTF file with one mesh per named mesh and nodes placing
+    these meshes by 3x4 transformation matrices, like `write_3mf`. Files
+    ending with `.gz` or `.zst` are compressed while writing.
+    """
+    colors = colors or {}
+    ids = {name: i for i, name in enumerate(meshes)}
+
+    doc: dict = {
+        "asset": {"version": "2.0", "generator": "someline"},
+        "scene": 0,
+        "scenes": [{"nodes": [0]}],
+        # glTF is Y-up, the root node rotates Z-up models by -90° about X.
+        "nodes": [{"rotation": [-(0.5**0.5), 0.0, 0.0, 0.5**0.5], "children": []}],
+        "meshes": [],
+        "materials": [],
+        "accessors": [],
+        "bufferViews": [],
+        "buffers": [],
+    }
+
+    arrays = []
+    offset = 0
+
+    def view(data: np.ndarray, target: int) -> int:
+        nonlocal offset
+        arrays.append(data)
+        doc["bufferViews"].append(
+            {
+                "buffer": 0,
+                "byteOffset": offset,
+                "byteLength": data.nbytes,
+                "target": target,
+            }
+        )
+        offset += data.nbytes
+        return len(doc["bufferViews"]) - 1
+
+    for name, mesh in meshes.items():
+        vertices = mesh.vertices.astype("<f4")
+        triangles = mesh.triangles.astype("<u4")
+
+        doc["accessors"].append(
+            {
+                "bufferView": view(vertices, 34962),
+                "componentType": 5126,
+                "count": len(vertices),
+                "type": "VEC3",
+                "min": vertices.min(axis=0).tolist(),
+                "max": vertices.max(axis=0).tolist(),
+            }
+        )
+        doc["accessors"].append(
+            {
+                "bufferView": view(triangles, 34963),
+                "componentType": 5125,
+                "count": triangles.size,
+                "type": "SCALAR",
+            }
+        )
+        doc["materials"].append(
+            {
+                "name": name,
+                "pbrMetallicRoughness": {
+                    "baseColorFactor": list(colors.get(name, (0.8, 0.8, 0.8, 1.0))),
+                    "metallicFactor": 0.0,
+                },
+            }
+        )
+        doc["meshes"].append(
+            {
+                "name": name,
+                "primitives": [
+                    {
+                        "attributes": {"POSITION": len(doc["accessors"]) - 2},
+                        "indices": len(doc["accessors"]) - 1,
+                        "material": ids[name],
+                    }
+                ],
+            }
+        )
+
+    for name, matrix in items:
+        m = np.eye(4)
+        m[:3] = np.asarray(matrix, dtype=np.float64)
+        doc["nodes"][0]["children"].append(len(doc["nodes"]))
+        # glTF matrices are stored in column-major order.
+        doc["nodes"].append(
+            {"name": name, "mesh": ids[name], "matrix": m.T.flatten().tolist()}
+        )
+
+    doc["buffers"].append({"byteLength": offset})
+
+    # All chunks are padded to four bytes, the JSON chunk with spaces.
+    header = json.dumps(doc, separators=(",", ":")).encode()
+    header += b" " * (-len(header) % 4)
+    padding = b"\0" * (-offset % 4)
+    length = 12 + 8 + len(header) + 8 + offset + len(padding)
+
+    with open_output(file) as f:
+        f.write(struct.pack("<4sII", b"glTF", 2, length))
+        f.write(struct.pack("<I4s", len(header), b"JSON"))
+        f.write(header)
+        f.write(struct.pack("<I4s", offset + len(padding), b"BIN\0"))
+        for data in arrays:
+            f.write(data.tobytes())
+        f.write(padding)
@@ -0,0 +1,53 @@
+# pylint: disable=missing-docstring
+
+
+from typing import Sequence
+
+# Printable area of the printer bed in millimeters
+BED = (256.0, 256.0)
+
+
+def shelves(
+    sizes: Sequence[tuple[float, float]],
+    bed: tuple[float, float] = BED,
+    padding: float = 1,
+) -> list[list[list[int]]]:
+    """
+    Distribute items of the given footprint sizes on as few plates as
+    possible, returning the rows of item indices for each plate.
+
+    Items are sorted by decreasing depth and placed into the first row of
+    the first plate with enough space left, using first-fit decreasing
+    height shelf packing. Space is measured like `Plate` lays out rows: each
+    row takes the depth of its deepest item plus padding, and the width of
+    its items with padding in between.
+    """
+    for x, y in sizes:
+        if x > bed[0] or y + padding > bed[1]:
+            raise ValueError(f"Item of size {x:g}x{y:g} does not fit on bed")
+
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0]))
+
+    # Each row is [item indices, used width, depth], each plate is
+    # [rows, used depth]. Rows are filled in order of decreasing depth, so
+    # an item never increases the depth of an existing row.
+    plates: list[list] = []
+    for i in order:
+        x, y = sizes[i]
+
+        for rows, _ in plates:
+            row = next((r for r in rows if r[1] + padding + x <= bed[0]), None)
+            if row:
+                row[0].append(i)
+                row[1] += padding + x
+                break
+        else:
+            plate = next((p for p in plates if p[1] + y + padding <= bed[1]), None)
+            if plate is None:
+                plate = [[], 0.0]
+                plates.append(plate)
+
+            plate[0].append([[i], x, y])
+            plate[1] += y + padding
+
+    return [[row[0] for row in rows] for rows, _ in plates]
@@ -0,0 +1,159 @@
+# pylint: disable=missing-docstring
+
+
+import functools
+import json
+import os
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+
+# build123d operations timed with `start(ops=True)`.
+OPERATIONS = (
+    "add",
+    "chamfer",
+    "extrude",
+    "fillet",
+    "loft",
+    "make_face",
+    "mirror",
+    "offset",
+)
+
+
+class Profiler:
+    """
+    Records wall time spans as Chrome trace events, which can be viewed in
+    Perfetto or `chrome://tracing`.
+    """
+
+    def __init__(self):
+        self.events: list[dict] = []
+
+    @contextmanager
+    def span(self, name: str, category: str):
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.events.append(
+                {
+                    "name": name,
+                    "cat": category,
+                    "ph": "X",
+                    "ts": start / 1000,
+                    "dur": (time.perf_counter_ns() - start) / 1000,
+                    "pid": os.getpid(),
+                    "tid": os.getpid(),
+                }
+            )
+
+    def report(self):
+        """
+        Summarize spans by category and name. Spans nest, e.g. booleans in
+        operations in model builds, so `self` excludes the time of nested
+        spans and adds up to the wall time, while `total` includes it.
+        """
+        totals = defaultdict(lambda: [0, 0.0, 0.0, 0.0])
+        for event, own in zip(self.events, self._self_times()):
+            total = totals[(event["cat"], event["name"])]
+            total[0] += 1
+            total[1] += own / 1e6
+            total[2] += event["dur"] / 1e6
+            total[3] = max(total[3], event["dur"] / 1e6)
+
+        lines = [
+            f"{'category':<10} {'name':<24} {'count':>6} "
+            f"{'self':>9} {'total':>9} {'max':>9}"
+        ]
+        for (cat, name), (count, own, total, max_) in sorted(
+            totals.items(), key=lambda item: item[1][1], reverse=True
+        ):
+            lines.append(
+                f"{cat:<10} {name:<24} {count:>6} "
+                f"{own:>8.3f}s {total:>8.3f}s {max_:>8.3f}s"
+            )
+
+        return "\n".join(lines)
+
+    def _self_times(self) -> list[float]:
+        # Spans of one process are nested or disjoint. Subtract each span
+        # from its innermost enclosing span.
+        own = [event["dur"] for event in self.events]
+        order = sorted(
+            range(len(self.events)),
+            key=lambda i: (
+                self.events[i]["pid"],
+                self.events[i]["ts"],
+                -self.events[i]["dur"],
+            ),
+        )
+
+        stack: list[int] = []
+        for i in order:
+            event = self.events[i]
+            while stack and (
+                self.events[stack[-1]]["pid"] != event["pid"]
+                or self.events[stack[-1]]["ts"] + self.events[stack[-1]]["dur"]
+                <= event["ts"]
+            ):
+                stack.pop()
+            if stack:
+                own[stack[-1]] -= event["dur"]
+            stack.append(i)
+
+        return own
+
+    def write(self, file: str):
+        with open(file, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+
+
+_active: Profiler | None = None
+
+
+def start(ops: bool = False) -> Profiler:
+    global _active  # pylint: disable=W0603
+    _active = Profiler()
+
+    if ops:
+        import build123d  # pylint: disable=C0415
+
+        for name in OPERATIONS:
+            setattr(build123d, name, _wrap(getattr(build123d, name), name))
+
+        # Boolean operations of objects and operations added to a builder
+        build123d.BuildPart._add_to_context = _wrap(
+            build123d.BuildPart._add_to_context, "boolean"
+        )
+
+    return _active
+
+
+def span(name: str, category: str):
+    if _active is None:
+        return nullcontext()
+    return _active.span(name, category)
+
+
+def collect() -> list[dict]:
+    """Take recorded events, e.g. to pass them from a worker process."""
+    if _active is None:
+        return []
+
+    events, _active.events = _active.events, []
+    return events
+
+
+def merge(events: list[dict]):
+    if _active is not None:
+        _active.events.extend(events)
+
+
+def _wrap(fn, name: str):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with span(name, "operation"):
+            return fn(*args, **kwargs)
+
+    return wrapper
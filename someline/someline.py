@@ -1,9 +1,104 @@
 # pylint: disable=missing-docstring
 
 
+import copy
+import functools
+import hashlib
+import io
 from contextlib import contextmanager
-
-import build123d as b
+from typing import TYPE_CHECKING
+
+from someline import lazy_import
+
+if TYPE_CHECKING:
+    import build123d as b
+else:
+    b = lazy_import("build123d")
+
+
+def memoize(fn):
+    """
+    Cache the result of a pure geometry function by its arguments, so that
+    repeated features are only built once per process. Callers receive
+    shallow copies sharing the underlying OCCT shape.
+    """
+    cached = functools.cache(fn)
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        result = cached(*args, **kwargs)
+        if isinstance(result, tuple):
+            return tuple(copy.copy(r) for r in result)
+        return copy.copy(result)
+
+    wrapper.cache_clear = cached.cache_clear
+    return wrapper
+
+
+class ShapeKey:
+    """
+    Hashable reference to a shape comparing equal to shapes of the same
+    geometry, e.g. to memoize functions taking sketches built per call.
+    """
+
+    def __init__(self, shape: "b.Shape"):
+        buffer = io.BytesIO()
+        b.export_brep(shape, buffer)
+
+        self.shape = shape
+        self.digest = hashlib.sha256(buffer.getvalue()).hexdigest()
+
+    def __eq__(self, other):
+        return isinstance(other, ShapeKey) and self.digest == other.digest
+
+    def __hash__(self):
+        return hash(self.digest)
+
+
+class Features:
+    """
+    Pads and pockets collected at locations, like `b.add` would place them,
+    and applied to the current part with one fuse of all pads and one cut
+    of all pockets instead of one boolean operation each.
+
+    Pockets must not cut into pads at other locations, since all pads are
+    added before any pocket is cut.
+    """
+
+    def __init__(self):
+        self.pads: list[b.Shape] = []
+        self.pockets: list[b.Shape] = []
+
+    def add(
+        self,
+        locations: "b.LocationList",
+        pad: "b.Shape | None" = None,
+        pocket: "b.Shape | None" = None,
+        rotation: tuple[float, float, float] = (0.0, 0.0, 0.0),
+    ):
+        """
+        Add a pad and its pocket at all locations of a `with b.Locations(...)
+        as locations` block.
+        """
+        rot = b.Rotation(*rotation)
+        for loc in locations.locations:
+            if pad is not None:
+                self.pads.append(pad.moved(rot).moved(loc))
+            if pocket is not None:
+                self.pockets.append(pocket.moved(rot).moved(loc))
+
+    def apply(self):
+        """
+        Add all pads and cut all pockets. Shapes are already located, so this
+        must not be called within a `b.Locations` block.
+        """
+        if self.pads:
+            b.add(self.pads)
+        if self.pockets:
+            b.add(self.pockets, mode=b.Mode.SUBTRACT)
+
+        self.pads = []
+        self.pockets = []
 
 
 @contextmanager
@@ -12,14 +107,50 @@ def make_box(
     width: float,
     height: float,
     wall_depth: float = 1.2,
-    sketch: b.Sketch | None = None,
+    sketch: "b.Sketch | None" = None,
+):
+    # Boxes of the same size share their shell, only customizations and
+    # final fillets are built per box.
+    shell = _make_box_shell(
+        length, width, height, wall_depth, ShapeKey(sketch) if sketch else None
+    )
+
+    with b.BuildPart(mode=b.Mode.PRIVATE) as part:
+        b.add(shell)
+
+        yield part
+
+        # Curve outermost edges
+        zx = part.edges().filter_by(b.Axis.Z).group_by(b.Axis.X)
+        b.fillet(zx[0] + zx[-1], radius=7)
+
+        # Bottom edge chamfer
+        zy = part.edges().group_by(b.Axis.Z)[0].group_by(b.Axis.Y)
+        b.chamfer(zy[0] + zy[-1], length=1)
+
+        # Inner top chamfer
+        b.chamfer(
+            part.edges().group_by(b.Axis.Z)[-1].group_by(b.Axis.Y)[1],
+            length=(wall_depth - 0.4),
+        )
+
+    return part.part
+
+
+@memoize
+def _make_box_shell(
+    length: float,
+    width: float,
+    height: float,
+    wall_depth: float,
+    sketch: ShapeKey | None,
 ):
     with b.BuildPart(mode=b.Mode.PRIVATE) as part:
         b.Box(length, width, height, align=b.Align.MIN)
 
         with b.BuildSketch(b.Plane.XY.offset(1.0)):
             if sketch:
-                b.add(sketch)
+                b.add(sketch.shape)
             else:
                 with b.Locations((wall_depth, wall_depth)):
                     b.RectangleRounded(
@@ -32,42 +163,66 @@ def make_box(
         b.extrude(amount=height, mode=b.Mode.SUBTRACT)
         b.fillet(part.edges().group_by(b.Axis.Z)[1], radius=4)
 
+    return part.part
+
+
+@contextmanager
+def make_loft_box(
+    length: float,
+    width: float,
+    height: float,
+    wall_depth: float = 1.2,
+    bottom_depth: float = 1.2,
+    loft: float = 0.5,
+    sketch: "b.Sketch | None" = None,
+):
+    # Boxes of the same size share their loft and shell, only
+    # customizations and final chamfers are built per box.
+    box, shell = _make_loft_box_shell(
+        length,
+        width,
+        height,
+        wall_depth,
+        bottom_depth,
+        loft,
+        ShapeKey(sketch) if sketch else None,
+    )
+
+    with b.BuildPart(mode=b.Mode.PRIVATE) as part:
+        b.add(shell)
+
         yield part
 
-        # Curve outermost edges
-        zx = part.edges().filter_by(b.Axis.Z).group_by(b.Axis.X)
-        b.fillet(zx[0] + zx[-1], radius=7)
+        # Cutoff excess stuff
+        b.add(box, mode=b.Mode.INTERSECT)
 
         # Bottom edge chamfer
-        zy = (
-            part.edges().group_by(b.Axis.Z)[0].group_by(b.Axis.Y)[0]
-            + part.edges().group_by(b.Axis.Z)[0].group_by(b.Axis.Y)[-1]
-        )
-        b.chamfer(zy, length=1)
+        zy = part.edges().group_by(b.Axis.Z)[0].group_by(b.Axis.Y)
+        b.chamfer(zy[0] + zy[-1], length=1)
 
         # Inner top chamfer
         b.chamfer(
-            part.edges().group_by(b.Axis.Z)[-1].group_by(b.Axis.Y)[1],
+            part.edges().group_by(b.Axis.Z)[-1].group_by(b.Axis.X)[1],
             length=(wall_depth - 0.4),
         )
 
     return part.part
 
 
-@contextmanager
-def make_loft_box(
+@memoize
+def _make_loft_box_shell(
     length: float,
     width: float,
     height: float,
-    wall_depth: float = 1.2,
-    bottom_depth: float = 1.2,
-    loft: float = 0.5,
-    sketch: b.Sketch | None = None,
+    wall_depth: float,
+    bottom_depth: float,
+    loft: float,
+    sketch: ShapeKey | None,
 ):
     with b.BuildPart(mode=b.Mode.PRIVATE) as box:
         with b.BuildSketch(b.Plane.XY.offset(height)) as skt:
             if sketch:
-                b.add(sketch)
+                b.add(sketch.shape)
             else:
                 b.RectangleRounded(
                     width=length,
@@ -99,27 +254,10 @@ def make_loft_box(
         # Round inner bottom edges
         b.fillet(part.edges().group_by(b.Axis.Z)[1], radius=4)
 
-        yield part
-
-        # Cutoff excess stuff
-        b.add(box, mode=b.Mode.INTERSECT)
-
-        # Bottom edge chamfer
-        zy = (
-            part.edges().group_by(b.Axis.Z)[0].group_by(b.Axis.Y)[0]
-            + part.edges().group_by(b.Axis.Z)[0].group_by(b.Axis.Y)[-1]
-        )
-        b.chamfer(zy, length=1)
-
-        # Inner top chamfer
-        b.chamfer(
-            part.edges().group_by(b.Axis.Z)[-1].group_by(b.Axis.X)[1],
-            length=(wall_depth - 0.4),
-        )
-
-    return part.part
+    return (box.part, part.part)
 
 
+@memoize
 def make_handle(length: float, thickness=0.8):
     with b.BuildPart(mode=b.Mode.PRIVATE) as handle:
         with b.BuildSketch(b.Plane.YZ):
@@ -138,6 +276,7 @@ def make_handle(length: float, thickness=0.8):
     return handle.part
 
 
+@memoize
 def make_wall_cutout(
     outer_width: float,
     inner_width: float,
@@ -172,6 +311,7 @@ def make_wall_cutout(
     return (pad.part, pocket)
 
 
+@memoize
 def make_wall_cutout_pocket(
     outer_width: float,
     inner_width: float,
@@ -0,0 +1,204 @@
+# pylint: disable=missing-docstring
+
+
+import io
+import itertools
+import re
+from typing import TYPE_CHECKING, Iterable
+
+from someline.files import open_output
+
+if TYPE_CHECKING:
+    from build123d import Location, Part, Shape
+
+TIMESTAMP = "0000-00-00T00:00:00"
+TIMESTAMP_PATTERN = re.compile("(FILE_NAME.*?')(\\d+-\\d+-\\d+T\\d+:\\d+:\\d+)(')")
+
+_ENTITY = re.compile(r"^#(\d+) = ", re.MULTILINE)
+_REFERENCE = re.compile(r"#(\d+)")
+_OCCURRENCE_ID = re.compile(r"(NEXT_ASSEMBLY_USAGE_OCCURRENCE\(')\d+(')")
+
+
+def write_shape(file: str, shape: "Shape"):
+    """Write a shape with `build123d.export_step`, see `normalize`."""
+    from build123d import export_step  # pylint: disable=C0415
+
+    buffer = io.BytesIO()
+    export_step(shape, buffer, timestamp=TIMESTAMP)
+    _write(file, buffer)
+
+
+def write_assembly(
+    file: str,
+    name: str,
+    parts: dict[str, "Part"],
+    items: Iterable[tuple[str, "Location"]],
+):
+    """
+    Write a STEP assembly with one product per named part and located
+    instances of these. Unlike `build123d.export_step` for a compound of
+    located copies, names and colors are set on the parts only instead of
+    being repeated as overrides on every instance.
+    """
+    # pylint: disable=C0415
+    from OCP.APIHeaderSection import APIHeaderSection_MakeHeader
+    from OCP.IFSelect import IFSelect_ReturnStatus
+    from OCP.Interface import Interface_Static
+    from OCP.Message import Message, Message_Gravity
+    from OCP.STEPCAFControl import STEPCAFControl_Controller, STEPCAFControl_Writer
+    from OCP.STEPControl import STEPControl_StepModelType
+    from OCP.TCollection import TCollection_ExtendedString, TCollection_HAsciiString
+    from OCP.TDataStd import TDataStd_Name
+    from OCP.TDocStd import TDocStd_Document
+    from OCP.TopAbs import TopAbs_SOLID
+    from OCP.TopExp import TopExp_Explorer
+    from OCP.XCAFApp import XCAFApp_Application
+    from OCP.XCAFDoc import XCAFDoc_ColorType, XCAFDoc_DocumentTool
+    from OCP.XSControl import XSControl_WorkSession
+
+    doc = TDocStd_Document(TCollection_ExtendedString("XmlOcaf"))
+    application = XCAFApp_Application.GetApplication_s()
+    application.NewDocument(TCollection_ExtendedString("MDTV-XCAF"), doc)
+    application.InitDocument(doc)
+    XCAFDoc_DocumentTool.SetLengthUnit_s(doc, 0.001)
+
+    shape_tool = XCAFDoc_DocumentTool.ShapeTool_s(doc.Main())
+    color_tool = XCAFDoc_DocumentTool.ColorTool_s(doc.Main())
+    shape_tool.SetAutoNaming_s(True)
+
+    labels = {}
+    for key, part in parts.items():
+        label = shape_tool.AddShape(part.wrapped, False)
+        TDataStd_Name.Set_s(label, TCollection_ExtendedString(part.label or key))
+
+        if part.color is not None:
+            color = part.color.wrapped
+            color_tool.SetColor(label, color, XCAFDoc_ColorType.XCAFDoc_ColorGen)
+
+            explorer = TopExp_Explorer(part.wrapped, TopAbs_SOLID)
+            while explorer.More():
+                solid = shape_tool.AddSubShape(label, explorer.Current())
+                if not solid.IsNull():
+                    color_tool.SetColor(
+                        solid, color, XCAFDoc_ColorType.XCAFDoc_ColorSurf
+                    )
+                explorer.Next()
+
+        labels[key] = label
+
+    assembly = shape_tool.NewShape()
+    TDataStd_Name.Set_s(assembly, TCollection_ExtendedString(name))
+    for key, loc in items:
+        component = shape_tool.AddComponent(assembly, labels[key], loc.wrapped)
+        TDataStd_Name.Set_s(component, TCollection_ExtendedString(key))
+    shape_tool.UpdateAssemblies()
+
+    # Same writer settings as `build123d.export_step`
+    for printer in Message.DefaultMessenger_s().Printers():
+        printer.SetTraceLevel(Message_Gravity.Message_Fail)
+
+    writer = STEPCAFControl_Writer(XSControl_WorkSession(), False)
+    writer.SetColorMode(True)
+    writer.SetLayerMode(True)
+    writer.SetNameMode(True)
+
+    header = APIHeaderSection_MakeHeader(writer.Writer().Model())
+    if not header.IsDone():
+        header = APIHeaderSection_MakeHeader(0)
+        header.Apply(writer.Writer().Model())
+
+    header.SetName(TCollection_HAsciiString(name))
+    header.SetTimeStamp(TCollection_HAsciiString(TIMESTAMP))
+    header.SetOriginatingSystem(TCollection_HAsciiString("build123d"))
+
+    STEPCAFControl_Controller.Init_s()
+    Interface_Static.SetIVal_s("write.surfacecurve.mode", 1)
+    Interface_Static.SetIVal_s("write.precision.mode", 0)
+    writer.Transfer(doc, STEPControl_StepModelType.STEPControl_AsIs)
+
+    buffer = io.BytesIO()
+    if writer.WriteStream(buffer) != IFSelect_ReturnStatus.IFSelect_RetDone:
+        raise RuntimeError(f"Failed to write STEP file: {file}")
+
+    _write(file, buffer)
+
+
+def _write(file: str, buffer: io.BytesIO):
+    with open_output(file) as f:
+        f.write(normalize(buffer.getvalue().decode("utf-8")).encode("utf-8"))
+
+
+def normalize(data: str) -> str:
+    """
+    Make STEP output byte-stable across runs and processes.
+
+    OCCT writes presentation styles, i.e. colors, after all geometry in an
+    order depending on memory addresses. These trailing entities are sorted
+    by their content and renumbered in that order. Assembly instance ids
+    are counted per process, and are renumbered per file.
+
+    Geometry is written as is. Parts read from the part cache can differ
+    from fresh builds in signed zeros and noise below 1e-12, as BREP files
+    store shape locations as transformation values. Exports compared byte
+    by byte must be built without the cache, as in CI.
+    """
+    data = TIMESTAMP_PATTERN.sub(rf"\g<1>{TIMESTAMP}\g<3>", data, count=1)
+
+    ids = itertools.count(1)
+    data = _OCCURRENCE_ID.sub(lambda m: f"{m.group(1)}{next(ids)}{m.group(2)}", data)
+
+    match = re.search(
+        r"^#(\d+) = MECHANICAL_DESIGN_GEOMETRIC_PRESENTATION_REPRESENTATION",
+        data,
+        re.MULTILINE,
+    )
+    end = data.rfind("ENDSEC;")
+    if not match or end < match.start():
+        return data
+
+    start = int(match.group(1))
+    chunks = _ENTITY.split(data[match.start() : end])[1:]
+    entities = {int(i): text for i, text in zip(chunks[::2], chunks[1::2])}
+
+    def refs(text: str):
+        return [int(r) for r in _REFERENCE.findall(text) if int(r) >= start]
+
+    # Sort trees of styles by their content with references to geometry,
+    # e.g. the styled solid, but not to other style entities.
+    keys = {}
+
+    def key(i: int) -> str:
+        if i not in keys:
+            keys[i] = _REFERENCE.sub(
+                lambda m: (
+                    f"({key(int(m.group(1)))})"
+                    if int(m.group(1)) >= start
+                    else m.group(0)
+                ),
+                entities[i],
+            )
+        return keys[i]
+
+    referenced = {r for text in entities.values() for r in refs(text)}
+    roots = sorted((i for i in entities if i not in referenced), key=key)
+
+    numbers: dict[int, int] = {}
+
+    def visit(i: int):
+        if i in numbers or i not in entities:
+            return
+        numbers[i] = start + len(numbers)
+        for r in refs(entities[i]):
+            visit(r)
+
+    for i in [*roots, *entities]:
+        visit(i)
+
+    def renumber(m: re.Match) -> str:
+        return f"#{numbers.get(int(m.group(1)), int(m.group(1)))}"
+
+    tail = "".join(
+        f"#{numbers[i]} = {_REFERENCE.sub(renumber, text)}"
+        for i, text in sorted(entities.items(), key=lambda e: numbers[e[0]])
+    )
+    return data[: match.start()] + tail + data[end:]
@@ -1,27 +1,54 @@
 # pylint: disable=missing-docstring
 
 
+import copy
+import csv
+import glob
+import hashlib
+import importlib
+import itertools
+import json
+import linecache
+import multiprocessing
 import os
 import re
+import runpy
+import sys
+import time
+import traceback
+import types
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from fnmatch import fnmatch
-from functools import cached_property
-from typing import Callable, Generator, Iterable
+from functools import cached_property, partial
+from typing import TYPE_CHECKING, Callable, Generator, Iterable
 
 import click
-from build123d import (
-    Color,
-    Compound,
-    Location,
-    Part,
-    Shape,
-    export_step,
-    export_stl,
-    pack,
-)
 
-STEP_TIMESTAMP_PATTERN = re.compile("FILE_NAME.*'(\\d+-\\d+-\\d+T\\d+:\\d+:\\d+)'")
+from someline import profiler
+from someline.cache import PartCache, fingerprint
+from someline.manifest import Manifest, file_hash
+from someline.files import COMPRESSIONS
+from someline.packing import BED, shelves
+
+# build123d is only imported when geometry is actually built, so that e.g.
+# listing exported files does not need to load OCCT.
+if TYPE_CHECKING:
+    from build123d import BoundBox, Color, Location, Part, Shape
+
+    from someline.mesh import Mesh
+
+# Linear and angular deflection of STL tessellation. The defaults are the
+# ones of build123d, the draft preset trades accuracy for faster exports
+# and smaller files, e.g. for previews.
+TOLERANCE = (1e-3, 0.1)
+DRAFT_TOLERANCE = (0.05, 0.5)
 
-ModelFunc = Callable[..., Part]
+# STL writers, the first one is the default. `occt` is build123d's
+# `export_stl`, `numpy` writes the model's mesh arrays in chunks.
+STL_WRITERS = ("numpy", "occt")
+
+ModelFunc = Callable[..., "Part"]
 
 
 class Model:
@@ -30,29 +57,130 @@ class Model:
         name: str,
         fn: ModelFunc,
         *,  # required customizations as keyword arguments:
-        color: Color | None = None,
+        color: "Color | int | str | None" = None,
         export: bool = True,
         grid: tuple[float, float] | None = None,
         filename: str | None = None,
+        tolerance: float = TOLERANCE[0],
+        angular_tolerance: float = TOLERANCE[1],
+        project: "Project | None" = None,
     ):
         self.name = name
         self.color = color
         self.grid = grid
         self.export = export
+        self.tolerance = tolerance
+        self.angular_tolerance = angular_tolerance
+        self.project = project
         self._fn = fn
+        self._mesh: "Mesh | None" = None
+        self._bounding_boxes: dict[float | None, "BoundBox"] = {}
         self.filename = filename
 
         if not self.filename:
             self.filename = name
 
+    @cached_property
+    def key(self):
+        return fingerprint(self._fn)
+
+    @cached_property
+    def identity(self):
+        """
+        Models with the same function and equal arguments share one build.
+        Unlike `key`, this compares the function itself, not its source.
+        """
+        fn = self._fn
+        if isinstance(fn, partial):
+            identity = (fn.func, fn.args, tuple(sorted(fn.keywords.items())))
+        else:
+            identity = (fn, (), ())
+
+        # Models with unhashable arguments are never shared.
+        try:
+            hash(identity)
+        except TypeError:
+            return (self,)
+        return identity
+
     @cached_property
     def part(self):
-        part = self._fn()
+        from build123d import Color  # pylint: disable=C0415
+
+        # Models with the same function and parameters share one build, each
+        # with its own label and color.
+        built = self.project._built if self.project else {}
+        if self.identity in built:
+            part = copy.copy(built[self.identity])
+        else:
+            part = self._build()
+            built[self.identity] = copy.copy(part)
+
         part.label = self.name
-        if self.color:
-            part.color = self.color
+        if self.color is not None:
+            part.color = (
+                self.color if isinstance(self.color, Color) else Color(self.color)
+            )
         return part
 
+    def _build(self):
+        cache = self.project.cache if self.project else None
+        part = cache.get(self.key) if cache else None
+
+        if part is None:
+            with profiler.span(self.name, "model"):
+                part = self._fn()
+            if cache:
+                cache.put(self.key, part)
+
+        return part
+
+    @property
+    def mesh(self) -> "Mesh":
+        """
+        Triangulation of the part, shared by STL export and the viewer. It is
+        recreated when the model's tolerances change.
+        """
+        from someline.mesh import tessellate  # pylint: disable=C0415
+
+        tolerance = (self.tolerance, self.angular_tolerance)
+        if self._mesh is None or self._mesh.tolerance != tolerance:
+            with profiler.span(self.name, "mesh"):
+                self._mesh = tessellate(self.part, *tolerance)
+        return self._mesh
+
+    def release(self):
+        """
+        Drop the built part and its mesh to free memory, e.g. after writing
+        its files. They are built again, or read from the cache, when used.
+        """
+        self.__dict__.pop("part", None)
+        self._mesh = None
+
+        # Keep the shared build while another model sharing it holds a copy
+        # of the part.
+        if self.project and not any(
+            "part" in m.__dict__ for m in self.project if m.identity == self.identity
+        ):
+            self.project._built.pop(self.identity, None)
+
+    def bounding_box(self, tolerance: float | None = None) -> "BoundBox":
+        # Computing bounding boxes of complex parts is expensive, and also
+        # removes their triangulation.
+        if tolerance not in self._bounding_boxes:
+            self._bounding_boxes[tolerance] = self.part.bounding_box(tolerance)
+        return self._bounding_boxes[tolerance]
+
+    @cached_property
+    def volume(self) -> float:
+        return self.part.volume
+
+    @cached_property
+    def footprint(self) -> tuple[float, float]:
+        """Size of the part on a plate, see `Plate.TOLERANCE`."""
+        size = self.bounding_box(Plate.TOLERANCE).size
+        return size.X, size.Y
+
 
 PlateFunc = Callable[..., Iterable[Iterable[Model]]]
 
@@ -60,6 +188,9 @@ PlateFunc = Callable[..., Iterable[Iterable[Model]]]
 class Plate:
     ALIGN_Y = True
 
+    # Bounding box tolerance for the layout of parts
+    TOLERANCE = 0.1
+
     def __init__(
         self,
         name: str,
@@ -79,11 +210,39 @@ class Plate:
     def rows(self):
         return self.fn()
 
+    @cached_property
+    def key(self):
+        h = hashlib.sha256(fingerprint(self.fn).encode())
+        h.update(repr((self.padding, Plate.ALIGN_Y)).encode())
+        for row in self.rows:
+            h.update(repr([(m.name, m.color, m.key) for m in row]).encode())
+        return h.hexdigest()
+
+    @cached_property
+    def placements(self) -> "list[tuple[Model, Location]]":
+        # Build all models first to only measure the layout itself.
+        for row in self.rows:
+            for model in row:
+                _ = model.part
+
+        with profiler.span(self.name, "plate"):
+            return self._layout()
+
     @cached_property
     def compound(self):
-        parts = []
+        from build123d import Compound  # pylint: disable=C0415
+
+        return Compound(
+            label=self.name,
+            children=[loc * model.part for model, loc in self.placements],
+        )
+
+    def _layout(self):
+        from build123d import Location  # pylint: disable=C0415
 
-        rbb = [[m.part.bounding_box(tolerance=0.1) for m in r] for r in self.rows]
+        placements = []
+
+        rbb = [[m.bounding_box(Plate.TOLERANCE) for m in r] for r in self.rows]
         rsx = [sum(bb.size.X for bb in r) + (len(r) - 1) * self.padding for r in rbb]
         mrx = max(rsx)
 
@@ -99,8 +258,6 @@ class Plate:
                 x_pad = (mrx - sum(bb.size.X for bb in bbs)) / (len(row) - 1)
 
             for model, bb in zip(row, bbs):
-                part = model.part
-
                 if abs(bb.min) > 0.1:
                     min = bb.min.reverse()
                     loc = Location(
@@ -113,10 +270,39 @@ class Plate:
                 else:
                     loc = Location((x, y))
 
-                parts.append(loc * part)
+                placements.append((model, loc))
                 x = x + bb.size.X + x_pad
 
-        return Compound(label=self.name, children=parts)
+        return placements
+
+
+class LiveModels:
+    """
+    Bounded set of models holding built parts, in order of their last use.
+    Models exceeding the size are released, least recently used first, as
+    are models without any remaining uses.
+    """
+
+    def __init__(self, size: int, uses: Counter | None = None):
+        self.size = size
+        self.uses = uses if uses is not None else Counter()
+        self._models: OrderedDict[Model, None] = OrderedDict()
+
+    def use(self, models: Iterable[Model]):
+        for model in models:
+            self._models[model] = None
+            self._models.move_to_end(model)
+
+            if model in self.uses:
+                self.uses[model] -= 1
+                if self.uses[model] <= 0:
+                    del self.uses[model]
+                    del self._models[model]
+                    model.release()
+
+        while len(self._models) > self.size:
+            model, _ = self._models.popitem(last=False)
+            model.release()
 
 
 class Project:
@@ -124,16 +310,25 @@ class Project:
         self,
         name: str,
         *,  # require customizations as keyword arguments:
-        default_color: Color | None = None,
+        default_color: "Color | int | str | None" = None,
         grid: tuple[float, float] | None = None,
         padding: int = 4,
+        tolerance: float = TOLERANCE[0],
+        angular_tolerance: float = TOLERANCE[1],
     ) -> None:
         self.name = name
         self.grid = grid
         self.padding = padding
         self.default_color = default_color
+        self.tolerance = tolerance
+        self.angular_tolerance = angular_tolerance
+        self.cache: PartCache | None = None
         self._models = {}
         self._plates: dict[str, Plate] = {}
+        self._built: dict[tuple, "Part"] = {}
+
+    def __repr__(self):
+        return f"Project({self.name!r})"
 
     def names(self):
         return list(self._models)
@@ -150,14 +345,21 @@ class Project:
         name: str,
         fn: ModelFunc,
         *,  # require customizations as keyword arguments:
-        color: Color | None = None,
+        color: "Color | int | str | None" = None,
         grid: tuple[int, int] | None = None,
         export: bool = True,
         filename: str | None = None,
+        tolerance: float | None = None,
+        angular_tolerance: float | None = None,
     ):
         if name in self._models:
             raise KeyError(f"Name {name} already taken")
 
+        if tolerance is None:
+            tolerance = self.tolerance
+        if angular_tolerance is None:
+            angular_tolerance = self.angular_tolerance
+
         self._models[name] = Model(
             name,
             fn,
@@ -165,8 +367,46 @@ class Project:
             grid=grid,
             export=export,
             filename=filename,
+            tolerance=tolerance,
+            angular_tolerance=angular_tolerance,
+            project=self,
         )
 
+    def add_family(
+        self,
+        name: str,
+        fn: ModelFunc,
+        *,  # require customizations as keyword arguments:
+        grid: tuple[int, int] | Callable[..., tuple[int, int]] | None = None,
+        filename: str | None = None,
+        **params: Iterable,
+    ):
+        """
+        Add a model for each combination of parameter values, e.g.
+
+            project.add_family("U{units}", make, units=range(1, 11))
+
+        Names and filenames are formatted with the parameters of each
+        variant, and `grid` can be a function of them. Other options are
+        the ones of `add`, and apply to all variants.
+        """
+        options = {
+            key: params.pop(key)
+            for key in ("color", "export", "tolerance", "angular_tolerance")
+            if key in params
+        }
+
+        keys = list(params)
+        for values in itertools.product(*params.values()):
+            variant = dict(zip(keys, values))
+            self.add(
+                name.format(**variant),
+                partial(fn, **variant),
+                grid=grid(**variant) if callable(grid) else grid,
+                filename=filename.format(**variant) if filename else None,
+                **options,
+            )
+
     def plate(self, name: str, **kwargs):
         def decorator(fn):
             if name in self._plates:
@@ -176,11 +416,39 @@ class Project:
 
         return decorator
 
-    def assembly(self, pattern: str | None = None, force_pack: bool = False):
+    def pack_plates(
+        self,
+        quantities: dict[str, int],
+        *,  # require customizations as keyword arguments:
+        bed: tuple[float, float] = BED,
+        padding: int = 1,
+        name: str = "plate",
+    ) -> list[Plate]:
+        """
+        Lay out the given number of each model on as few plates of the bed
+        size as possible. Plates are named `{name}-1`, `{name}-2`, and so on.
+        """
+        models = [self[key] for key, count in quantities.items() for _ in range(count)]
+        layout = shelves([model.footprint for model in models], bed, padding)
+
+        return [
+            Plate(
+                f"{name}-{i}",
+                _fixed_rows([[models[j] for j in row] for row in rows]),
+                padding=padding,
+            )
+            for i, rows in enumerate(layout, start=1)
+        ]
+
+    def select(self, pattern: str | None = None) -> list[Model]:
         if pattern:
-            models = [m for m in self if fnmatch(m.name, pattern)]
-        else:
-            models = [m for m in self]
+            return [m for m in self if fnmatch(m.name, pattern)]
+        return [m for m in self]
+
+    def assembly(self, pattern: str | None = None, force_pack: bool = False):
+        from build123d import Compound, Location  # pylint: disable=C0415
+
+        models = self.select(pattern)
 
         if not models:
             return None
@@ -197,7 +465,7 @@ class Project:
                 for m in models
             ]
         else:
-            parts = pack([m.part for m in models], padding=self.padding, align_z=True)
+            parts = _pack(models, padding=self.padding)
 
         return Compound(
             label=self.name,
@@ -205,80 +473,889 @@ class Project:
         )
 
     def main(self):
-        _main(obj=self)  # pylint: disable=E1120
+        # Scripts are named like `someline-36.py`, which would not result in a
+        # valid environment variable name for shell completion.
+        complete_var = re.sub(r"\W", "_", f"_{self.name}_complete").upper()
+        _main(obj=self, complete_var=complete_var)  # pylint: disable=E1120
+
+
+def find_projects(namespace: dict) -> list[Project]:
+    """Return the projects defined in a script's namespace."""
+    # Checking modules first avoids loading lazily imported modules, such as
+    # build123d, which `isinstance` would do to look up their class.
+    return [
+        value
+        for value in namespace.values()
+        if not isinstance(value, types.ModuleType) and isinstance(value, Project)
+    ]
+
+
+def _fixed_rows(rows: list[list[Model]]) -> PlateFunc:
+    return lambda: rows
+
+
+def _pack(models: list[Model], padding: float):
+    """
+    Same as `build123d.pack(..., align_z=True)` but packing boxes of the
+    models' memoized bounding boxes, instead of computing the bounding box
+    of each part multiple times.
+    """
+    from build123d import Plane, Solid, pack  # pylint: disable=C0415
+
+    boxes = []
+    for model in models:
+        bb = model.bounding_box()
+        boxes.append(Solid.make_box(*bb.size, plane=Plane(origin=bb.min)))
+
+    # The boxes are built in place without a location of their own, so the
+    # location of each packed box is the move of the model.
+    packed = pack(boxes, padding=padding, align_z=True)
+    return [box.location * model.part for box, model in zip(packed, models)]
 
 
 _pass_project = click.make_pass_decorator(Project)
 
 
+def _options(*options):
+    def decorator(fn):
+        for option in reversed(options):
+            fn = option(fn)
+        return fn
+
+    return decorator
+
+
+_main_options = _options(
+    click.option(
+        "--cache",
+        "cache_dir",
+        type=click.Path(file_okay=False),
+        envvar="SOMELINE_CACHE",
+    ),
+    click.option("--profile", "_profile", is_flag=True, default=False),
+    click.option("--profile-ops", is_flag=True, default=False),
+    click.option(
+        "--profile-output",
+        type=click.Path(dir_okay=False),
+        default="profile.json",
+        show_default=True,
+    ),
+    click.option(
+        "--cache-size",
+        type=click.IntRange(min=0),
+        default=1024,
+        envvar="SOMELINE_CACHE_SIZE",
+        show_default=True,
+        help="Maximum cache size in MB",
+    ),
+)
+
+
 @click.group(invoke_without_command=True)
+@_main_options
 @click.pass_context
-def _main(ctx: click.Context):
+def _main(ctx: click.Context, **kwargs):
+    project = ctx.find_object(Project)
+    _setup(ctx, [project] if project else [], **kwargs)
+
     if not ctx.invoked_subcommand:
         ctx.invoke(_run)
 
 
+def _setup(
+    ctx: click.Context,
+    projects: list[Project],
+    cache_dir: str | None,
+    cache_size: int,
+    _profile: bool,
+    profile_ops: bool,
+    profile_output: str,
+):
+    # All projects share one cache, e.g. for models used by several projects
+    if projects and cache_dir:
+        cache = PartCache(cache_dir, max_size=cache_size * 2**20)
+        for project in projects:
+            project.cache = cache
+        ctx.call_on_close(lambda: click.echo(cache.summary(), err=True))
+
+    if _profile or profile_ops:
+        prof = profiler.start(ops=profile_ops)
+
+        def report():
+            click.echo(prof.report(), err=True)
+            prof.write(profile_output)
+
+        ctx.call_on_close(report)
+
+
+def _complete_models(ctx: click.Context, _, incomplete: str):
+    project = ctx.find_object(Project)
+    return [name for name in project.names() if name.startswith(incomplete)]
+
+
+def _complete_plates(ctx: click.Context, _, incomplete: str):
+    project = ctx.find_object(Project)
+    return [name for name in project._plates if name.startswith(incomplete)]
+
+
 @_main.command(name="run")
-@click.argument("pattern", default="")
+@click.argument("pattern", default="", shell_complete=_complete_models)
 @click.option("--pack", is_flag=True)
 @_pass_project
 def _run(project: Project, pattern: str, pack: bool):
-    import ocp_vscode  # pylint: disable=C0415
+    if not _show(project, pattern, pack):
+        raise click.Abort()
+
+
+@_main.command(name="watch")
+@click.argument("pattern", default="", shell_complete=_complete_models)
+@click.option("--pack", is_flag=True)
+@click.option(
+    "--interval",
+    type=click.FloatRange(min=0, min_open=True),
+    default=0.5,
+    show_default=True,
+    help="Seconds between checks for changed files",
+)
+@_pass_project
+def _watch(project: Project, pattern: str, pack: bool, interval: float):
+    """
+    Show models and update the viewer whenever the project script or
+    `someline` helpers change, only rebuilding models whose fingerprint
+    changed.
+    """
+    script = os.path.abspath(sys.modules["__main__"].__file__)
+    package = os.path.dirname(os.path.abspath(__file__))
+
+    def mtimes():
+        files = [script, *glob.glob(os.path.join(package, "*.py"))]
+        return {file: os.stat(file).st_mtime_ns for file in files}
+
+    seen = mtimes()
+    while True:
+        start = time.perf_counter()
+        built = set(project._built)
+        _show(project, pattern, pack)
+
+        rebuilt = [
+            m.name for m in project if "part" in vars(m) and m.identity not in built
+        ]
+        click.echo(
+            f"Updated in {time.perf_counter() - start:.2f}s, "
+            f"rebuilt: {', '.join(rebuilt) or '-'}",
+            err=True,
+        )
 
+        # Fingerprint models before the files change, as fingerprints read
+        # the source from the files. `_reload` compares them to the new ones.
+        for model in project:
+            _ = model.key
+
+        while True:
+            time.sleep(interval)
+            current = mtimes()
+            if current != seen:
+                changed = {f for f in current if current[f] != seen.get(f)}
+                seen = current
+                try:
+                    project = _reload(project, script, changed)
+                    break
+                except Exception:  # pylint: disable=W0718
+                    click.echo(traceback.format_exc(), err=True)
+
+
+def _reload(project: Project, script: str, changed: set[str]) -> Project:
+    # Reload changed helper modules, and run the script again to get a new
+    # project with the new model functions. Changes to this module itself
+    # require a restart.
+    linecache.checkcache()
+    for name, module in list(sys.modules.items()):
+        file = getattr(module, "__file__", None)
+        if not name.startswith("someline.") or not file:
+            continue
+        if os.path.abspath(file) in changed:
+            if name == __name__:
+                click.echo(f"Restart to apply changes to {name}", err=True)
+            else:
+                importlib.reload(module)
+
+    namespace = runpy.run_path(script, run_name="__watch__")
+    new = next(p for p in find_projects(namespace) if p.name == project.name)
+
+    # Keep parts and derived geometry of models whose fingerprint did not
+    # change, and only build the others. The new script creates new model
+    # functions, so builds are matched by model name.
+    previous = {model.name: model for model in project}
+    new.cache = project.cache
+    for model in new:
+        old = previous.get(model.name)
+        if old is None or old.key != model.key:
+            continue
+        if old.identity in project._built:
+            new._built.setdefault(model.identity, project._built[old.identity])
+        model._mesh = old._mesh
+        model._bounding_boxes = old._bounding_boxes
+
+    return new
+
+
+def _glob(pattern: str) -> str:
+    # Plain names match as substrings
     if pattern:
         if "*" not in pattern and "?" not in pattern and "[" not in pattern:
             pattern = f"*{pattern}*"
+    return pattern
+
+
+def _show(project: Project, pattern: str, pack: bool) -> bool:
+    import ocp_vscode  # pylint: disable=C0415
 
+    pattern = _glob(pattern)
     assembly = project.assembly(pattern, force_pack=pack)
     if not assembly:
         click.echo(f"No match found for: {pattern}")
-        raise click.Abort()
+        return False
+
+    # The viewer reuses the triangulation stored on the parts instead of
+    # meshing them again.
+    for model in project.select(pattern):
+        _ = model.mesh
 
     ocp_vscode.show(assembly)
+    return True
 
 
 @_main.command(name="plate")
-@click.argument("name")
+@click.argument("name", shell_complete=_complete_plates)
 @_pass_project
 def _plate(project: Project, name: str):
     import ocp_vscode  # pylint: disable=C0415
 
-    ocp_vscode.show(project._plates[name].compound)
+    plate = project._plates[name]
+    compound = plate.compound
+
+    # Mesh after the layout, computing bounding boxes removes triangulations.
+    for row in plate.rows:
+        for model in row:
+            _ = model.mesh
+
+    ocp_vscode.show(compound)
+
+
+_export_options = _options(
+    click.option("--list", "_list", is_flag=True, default=False),
+    click.option("-j", "--jobs", type=click.IntRange(min=1), default=1),
+    click.option("--force", is_flag=True, default=False),
+    click.option("--tolerance", type=click.FloatRange(min=0, min_open=True)),
+    click.option("--angular-tolerance", type=click.FloatRange(min=0, min_open=True)),
+    click.option("--draft", is_flag=True, default=False),
+    click.option(
+        "--stl-writer",
+        type=click.Choice(STL_WRITERS),
+        default=STL_WRITERS[0],
+        show_default=True,
+    ),
+    click.option(
+        "--compress",
+        type=click.Choice(COMPRESSIONS),
+        help="Compress STEP and STL files while writing",
+    ),
+    click.option("--glb", is_flag=True, default=False, help="Write binary glTF files"),
+    click.option(
+        "--max-parts",
+        type=click.IntRange(min=1),
+        help="Release parts after writing, keeping at most this many built",
+    ),
+)
 
 
 @_main.command(name="export")
-@click.option("--list", "_list", is_flag=True, default=False)
+@_export_options
 @click.argument("directory", default="")
 @_pass_project
-def _export(project: Project, _list: bool, directory: str):
+def _export(project: Project, directory: str, **kwargs):
     if not directory:
         directory = os.path.join("export", project.name)
 
-    models = [model for model in project if model.export]
-    plates = [plate for plate in project._plates.values()]
+    _export_projects([(project, directory)], **kwargs)
 
-    if _list:
-        for model in models:
-            print(os.path.join(directory, f"{model.filename}.step"))
-            print(os.path.join(directory, f"{model.filename}.stl"))
-        for plate in plates:
-            print(os.path.join(directory, f"{plate.filename}.step"))
 
+def _export_projects(
+    targets: list[tuple[Project, str]],
+    _list: bool,
+    jobs: int,
+    force: bool,
+    tolerance: float | None,
+    angular_tolerance: float | None,
+    draft: bool,
+    stl_writer: str,
+    compress: str | None,
+    glb: bool,
+    max_parts: int | None,
+):
+    """
+    Export models and plates of projects into their directories, running
+    the tasks of all projects in one pool of workers.
+
+    With `max_parts`, models are exported right before the plates using
+    them, and released once written and placed on all their plates.
+    """
+    if compress == "zst":
+        try:
+            from compression import zstd  # noqa: F401 pylint: disable=C0415,W0611
+        except ImportError as e:
+            raise click.UsageError("Python is built without zstd support") from e
+    if compress and stl_writer != "numpy":
+        raise click.UsageError("--compress requires the numpy STL writer")
+
+    options = {"stl_writer": stl_writer, "compress": compress, "glb": glb}
+
+    # Explicit tolerances take precedence over the draft preset.
+    if draft:
+        if tolerance is None:
+            tolerance = DRAFT_TOLERANCE[0]
+        if angular_tolerance is None:
+            angular_tolerance = DRAFT_TOLERANCE[1]
+
+    projects = {project.name: (project, directory) for project, directory in targets}
+    manifests = {}
+    keys = {}
+    tasks = []
+
+    for project, directory in targets:
+        # Tessellation options given on the command line override both
+        # project and model settings.
+        for model in project:
+            if tolerance is not None:
+                model.tolerance = tolerance
+            if angular_tolerance is not None:
+                model.angular_tolerance = angular_tolerance
+
+        models = [model for model in project if model.export]
+        plates = [plate for plate in project._plates.values()]
+
+        if _list:
+            for model in models:
+                for file in _files(
+                    directory, "model", model.filename, options
+                ).values():
+                    print(file)
+            for plate in plates:
+                for file in _files(
+                    directory, "plate", plate.filename, options
+                ).values():
+                    print(file)
+            continue
+
+        # Only export tasks whose inputs changed, or whose files have been
+        # modified or removed since the last export.
+        manifest = Manifest(f"{os.path.normpath(directory)}.manifest.json", directory)
+        manifests[project.name] = manifest
+
+        for task in [("model", model.name) for model in models] + [
+            ("plate", plate.name) for plate in plates
+        ]:
+            keys[(project.name, *task)] = key = _export_key(project, options, *task)
+            if force or not manifest.fresh("/".join(task), key):
+                tasks.append((project.name, *task))
+
+    def done(task, files):
+        manifest = manifests[task[0]]
+        manifest.update("/".join(task[1:]), keys[task], files)
+        manifest.save()
+        for file in files:
+            click.echo(file)
+
+    if _list:
         return
 
-    for model in models:
-        _export_step(model.part, os.path.join(directory, f"{model.filename}.step"))
-        _export_stl(model.part, os.path.join(directory, f"{model.filename}.stl"))
+    if jobs < 2:
+        live = None
+        if max_parts:
+            tasks = _plate_order(projects, tasks)
+            live = LiveModels(max_parts, _uses(projects, tasks))
+
+        for task in tasks:
+            project, directory = projects[task[0]]
+            done(task, _export_task(project, directory, options, *task[1:]))
+            if live:
+                live.use(_task_models(project, *task[1:]))
+
+    else:
+        # Plates are submitted first as they are the most expensive tasks,
+        # building all their models within the worker.
+        tasks = sorted(tasks, key=lambda task: task[1] != "plate")
+        for task, files in _parallel(projects, tasks, jobs, options, max_parts):
+            done(task, files)
+
+    click.echo(_peak_memory(workers=jobs > 1), err=True)
+
+
+def _task_models(project: Project, kind: str, name: str) -> list[Model]:
+    if kind == "plate":
+        return list({m: None for row in project._plates[name].rows for m in row})
+    return [project[name]]
+
+
+def _plate_order(
+    projects: dict[str, tuple[Project, str]], tasks: list[tuple[str, str, str]]
+) -> list[tuple[str, str, str]]:
+    # Export models right before the first plate using them, so that parts
+    # are written and placed while being built only once.
+    pending = {task for task in tasks if task[1] == "model"}
+    ordered = []
+    for task in tasks:
+        if task[1] != "plate":
+            continue
+        for model in _task_models(projects[task[0]][0], *task[1:]):
+            if (task[0], "model", model.name) in pending:
+                pending.remove((task[0], "model", model.name))
+                ordered.append((task[0], "model", model.name))
+        ordered.append(task)
+
+    return ordered + [task for task in tasks if task in pending]
+
+
+def _uses(
+    projects: dict[str, tuple[Project, str]], tasks: list[tuple[str, str, str]]
+) -> Counter:
+    uses = Counter()
+    for task in tasks:
+        uses.update(_task_models(projects[task[0]][0], *task[1:]))
+    return uses
+
+
+def _peak_memory(workers: bool = False) -> str:
+    import resource  # pylint: disable=C0415
 
+    # Maximum resident set sizes are reported in KiB on Linux, and in
+    # bytes on macOS.
+    unit = 1 if sys.platform == "darwin" else 1024
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit
+    text = f"peak memory: {peak / 2**20:.0f} MB"
+
+    if workers:
+        peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * unit
+        text += f", {peak / 2**20:.0f} MB per worker"
+    return text
+
+
+@_main.command(name="verify")
+@click.argument("pattern", default="", shell_complete=_complete_models)
+@click.option("-j", "--jobs", type=click.IntRange(min=1), default=1)
+@click.option("--update", is_flag=True, default=False, help="Store new fingerprints")
+@click.option("--file", type=click.Path(dir_okay=False))
+@_pass_project
+def _verify(project: Project, pattern: str, jobs: int, update: bool, file: str):
+    """
+    Compare geometric fingerprints of models, e.g. volume and a hash of
+    their triangulation, with the ones stored for the committed exports.
+    """
+    from someline import verify  # pylint: disable=C0415
+
+    if not file:
+        file = os.path.join("export", f"{project.name}.fingerprints.json")
+
+    models = [m for m in project.select(_glob(pattern)) if m.export]
+    tasks = [(project.name, "measure", model.name) for model in models]
+
+    if jobs < 2:
+        results = ((task, verify.measure(project[task[2]])) for task in tasks)
+    else:
+        results = _parallel({project.name: (project, "")}, tasks, jobs)
+
+    expected = verify.load(file)
+    fingerprints = dict(expected) if pattern else {}
+    failures = 0
+
+    for (_, _, name), actual in results:
+        fingerprints[name] = actual
+        if name not in expected:
+            errors = ["no stored fingerprint"]
+        else:
+            errors = verify.compare(expected[name], actual)
+
+        if errors and not update:
+            failures += 1
+            click.echo(f"{name}: FAILED", err=True)
+            for error in errors:
+                click.echo(f"  {error}", err=True)
+        else:
+            click.echo(f"{name}: ok", err=True)
+
+    if update:
+        verify.save(file, fingerprints)
+    elif failures:
+        raise click.ClickException(f"{failures} of {len(tasks)} models changed")
+
+
+@_main.command(name="order")
+@click.option(
+    "--bed",
+    type=(float, float),
+    default=BED,
+    show_default=True,
+    help="Printable bed size in mm",
+)
+@click.argument("file", type=click.Path(exists=True, dir_okay=False))
+@click.argument("directory", default="")
+@_pass_project
+def _order(
+    project: Project,
+    bed: tuple[float, float],
+    file: str,
+    directory: str,
+):
+    """
+    Export plates for an order of model quantities, e.g. `{"U2": 12}` as
+    JSON or YAML, or CSV rows like `U2,12`.
+    """
+    if not directory:
+        directory = os.path.splitext(file)[0]
+
+    quantities = _read_order(file)
+    unknown = [name for name in quantities if name not in project.names()]
+    if unknown:
+        raise click.UsageError(f"Unknown models in order: {', '.join(unknown)}")
+
+    try:
+        plates = project.pack_plates(quantities, bed=bed)
+    except ValueError as e:
+        raise click.UsageError(str(e)) from e
+
+    # Models are built once and shared by all plates of the order.
     for plate in plates:
-        _export_step(plate.compound, os.path.join(directory, f"{plate.filename}.step"))
+        step = os.path.join(directory, f"{plate.filename}.step")
+        tmf = os.path.join(directory, f"{plate.filename}.3mf")
+        _export_plate_step(plate, step)
+        _export_3mf(plate, tmf)
+        click.echo(step)
+        click.echo(tmf)
+
+
+def _read_order(file: str) -> dict[str, int]:
+    ext = os.path.splitext(file)[1].lower()
+
+    with open(file, encoding="utf-8", newline="") as f:
+        if ext == ".csv":
+            reader = csv.reader(f)
+            rows = [(reader.line_num, r) for r in reader if r and r[0].strip()]
+            # Skip an optional header row, e.g. `model,quantity`
+            if rows and len(rows[0][1]) == 2:
+                try:
+                    int(rows[0][1][1])
+                except ValueError:
+                    rows = rows[1:]
+            data = Counter()
+            for line, row in rows:
+                try:
+                    name, count = row
+                    data[name.strip()] += int(count)
+                except ValueError as e:
+                    raise click.UsageError(
+                        f"{file}:{line}: expected model name and quantity, "
+                        f"got {','.join(row)!r}"
+                    ) from e
+        elif ext in (".yaml", ".yml"):
+            try:
+                import yaml  # pylint: disable=C0415
+            except ImportError as e:
+                raise click.UsageError("YAML orders require PyYAML") from e
+            try:
+                data = yaml.safe_load(f)
+            except yaml.YAMLError as e:
+                raise click.UsageError(f"{file}: {e}") from e
+        else:
+            try:
+                data = json.load(f)
+            except json.JSONDecodeError as e:
+                raise click.UsageError(f"{file}:{e.lineno}: {e.msg}") from e
+
+    # JSON and YAML booleans are ints in Python
+    if not isinstance(data, dict) or not all(
+        isinstance(n, int) and not isinstance(n, bool) and n >= 0 for n in data.values()
+    ):
+        raise click.UsageError(f"{file}: expected quantities by model name")
+
+    order = {str(name): count for name, count in data.items() if count}
+    if not order:
+        raise click.UsageError(f"{file}: no models ordered")
+    return order
+
+
+def main():
+    """
+    Run commands for all project scripts in one process, e.g. `someline
+    export` to export all projects.
+    """
+    _all(prog_name="someline")  # pylint: disable=E1120
 
 
-def _export_stl(shape: Shape, file: str):
+@click.group()
+@_main_options
+@click.option(
+    "-s",
+    "--script",
+    "scripts",
+    multiple=True,
+    type=click.Path(exists=True, dir_okay=False),
+    help="Project script, defaults to all scripts in the current directory",
+)
+@click.pass_context
+def _all(ctx: click.Context, scripts: tuple[str, ...], **kwargs):
+    ctx.obj = _load_projects(scripts or sorted(glob.glob("*.py")))
+    _setup(ctx, ctx.obj, **kwargs)
+
+
+def _load_projects(scripts: Iterable[str]) -> list[Project]:
+    # Scripts only register their models when not run as main script, and
+    # share all imported modules, e.g. build123d, within this process.
+    projects = {}
+    for script in scripts:
+        namespace = runpy.run_path(script, run_name="__someline__")
+        for value in find_projects(namespace):
+            if value in projects.values():
+                continue
+            if value.name in projects:
+                raise click.UsageError(f"Project {value.name} defined twice")
+            projects[value.name] = value
+
+    return list(projects.values())
+
+
+@_all.command(name="export")
+@_export_options
+@click.option(
+    "-o",
+    "--output",
+    default="export",
+    show_default=True,
+    type=click.Path(file_okay=False),
+    help="Directory for one export directory per project",
+)
+@click.pass_obj
+def _export_all(projects: list[Project], output: str, **kwargs):
+    """
+    Export all projects, sharing workers and the part cache between them.
+    """
+    targets = [(p, os.path.join(output, p.name)) for p in projects]
+    _export_projects(targets, **kwargs)
+
+
+# Changes to the exporter itself, e.g. plate layout or file writers in other
+# modules, invalidate all exports. Model helpers in `someline.someline` are
+# covered by the model fingerprints instead.
+_EXPORTER_HASH = hashlib.sha256(
+    "".join(
+        file_hash(file)
+        for file in sorted(glob.glob(os.path.join(os.path.dirname(__file__), "*.py")))
+        if os.path.basename(file) not in ("someline.py", "bench.py")
+    ).encode()
+).hexdigest()
+
+
+def _export_key(project: Project, options: dict, kind: str, name: str):
+    if kind == "plate":
+        plate = project._plates[name]
+        attrs = (
+            plate.key,
+            plate.name,
+            plate.filename,
+            [(m.tolerance, m.angular_tolerance) for row in plate.rows for m in row],
+        )
+    else:
+        model = project[name]
+        attrs = (
+            model.key,
+            model.name,
+            model.filename,
+            model.color,
+            model.tolerance,
+            model.angular_tolerance,
+        )
+
+    attrs += (sorted(options.items()),)
+    return hashlib.sha256(f"{_EXPORTER_HASH}{attrs!r}".encode()).hexdigest()
+
+
+def _parallel(
+    projects: dict[str, tuple[Project, str]],
+    tasks: list[tuple[str, str, str]],
+    jobs: int,
+    options: dict | None = None,
+    max_parts: int | None = None,
+):
+    """
+    Run tasks of projects in a pool of forked workers, yielding tasks and
+    their results as they complete. Tasks name their project, and projects
+    map to their export directory.
+    """
+    # Workers are forked with the registered but not yet built projects, and
+    # rebuild their parts by name. OCCT shapes cannot be cheaply passed
+    # between processes.
+    if "fork" not in multiprocessing.get_all_start_methods():
+        raise click.UsageError("--jobs requires the fork start method")
+
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        mp_context=multiprocessing.get_context("fork"),
+        initializer=_init_worker,
+        initargs=(projects, options, max_parts),
+    ) as executor:
+        futures = {executor.submit(_run_worker, *task): task for task in tasks}
+        for future in as_completed(futures):
+            result, stats, events = future.result()
+            project = projects[futures[future][0]][0]
+            if project.cache:
+                project.cache.stats.update(stats)
+            profiler.merge(events)
+            yield futures[future], result
+
+
+_worker: tuple[dict[str, tuple[Project, str]], dict, LiveModels | None] | None = None
+
+
+def _init_worker(
+    projects: dict[str, tuple[Project, str]],
+    options: dict | None,
+    max_parts: int | None = None,
+):
+    global _worker  # pylint: disable=W0603
+    _worker = (projects, options or {}, LiveModels(max_parts) if max_parts else None)
+
+    # Drop events inherited from the parent process
+    profiler.collect()
+
+
+def _run_worker(project_name: str, kind: str, name: str):
+    from someline import verify  # pylint: disable=C0415
+
+    assert _worker
+    projects, options, live = _worker
+    project, directory = projects[project_name]
+    if kind == "measure":
+        result = verify.measure(project[name])
+    else:
+        result = _export_task(project, directory, options, kind, name)
+
+    # Workers do not know which tasks remain, and only bound live parts.
+    if live:
+        live.use(_task_models(project, kind, name))
+
+    # Report cache statistics and profile events per task to be merged by
+    # the parent process.
+    stats = Counter()
+    if project.cache:
+        stats, project.cache.stats = project.cache.stats, Counter()
+
+    return result, stats, profiler.collect()
+
+
+def _files(directory: str, kind: str, filename: str, options: dict) -> dict[str, str]:
+    """
+    Return the files written for a model or plate by export format, with
+    the extension of the compression format if any.
+    """
+    compress = f".{options['compress']}" if options.get("compress") else ""
+    path = os.path.join(directory, filename)
+
+    if kind == "plate":
+        files = {"step": f"{path}.step{compress}", "3mf": f"{path}.3mf"}
+    else:
+        files = {"step": f"{path}.step{compress}", "stl": f"{path}.stl{compress}"}
+    if options.get("glb"):
+        files["glb"] = f"{path}.glb"
+
+    return files
+
+
+def _export_task(project: Project, directory: str, options: dict, kind: str, name: str):
+    if kind == "plate":
+        plate = project._plates[name]
+        files = _files(directory, kind, plate.filename, options)
+        _export_plate_step(plate, files["step"])
+        _export_3mf(plate, files["3mf"])
+        if "glb" in files:
+            _export_glb(plate.placements, files["glb"])
+        return list(files.values())
+
+    model = project[name]
+    files = _files(directory, kind, model.filename, options)
+    _export_step(model.part, files["step"])
+    _export_stl(model, files["stl"], options.get("stl_writer", STL_WRITERS[0]))
+    if "glb" in files:
+        _export_glb([(model, None)], files["glb"])
+    return list(files.values())
+
+
+def _export_stl(model: Model, file: str, writer: str = STL_WRITERS[0]):
+    from build123d import export_stl  # pylint: disable=C0415
+
+    from someline.mesh import write_stl  # pylint: disable=C0415
+
+    # Both writers use the model's triangulation, OCCT does not mesh a shape
+    # again if it already has a triangulation of the requested tolerance.
+    mesh = model.mesh
+
+    os.makedirs(os.path.dirname(file), exist_ok=True)
+    with profiler.span(os.path.basename(file), "stl"):
+        if writer == "numpy":
+            write_stl(mesh, file)
+        else:
+            export_stl(model.part, file, *mesh.tolerance)
+
+
+def _export_3mf(plate: Plate, file: str):
+    from someline.mesh import write_3mf  # pylint: disable=C0415
+
+    # Each distinct model is written once and placed by transforms.
+    meshes = {model.name: model.mesh for model, _ in plate.placements}
+    items = [(model.name, _matrix(loc)) for model, loc in plate.placements]
+
+    os.makedirs(os.path.dirname(file), exist_ok=True)
+    with profiler.span(os.path.basename(file), "3mf"):
+        write_3mf(file, meshes, items)
+
+
+def _export_glb(placements: list[tuple[Model, "Location | None"]], file: str):
+    from someline.mesh import write_glb  # pylint: disable=C0415
+
+    meshes = {model.name: model.mesh for model, _ in placements}
+    colors = {
+        model.name: tuple(model.part.color)
+        for model, _ in placements
+        if model.part.color is not None
+    }
+    items = [(model.name, _matrix(loc)) for model, loc in placements]
+
     os.makedirs(os.path.dirname(file), exist_ok=True)
-    export_stl(shape, file)
+    with profiler.span(os.path.basename(file), "glb"):
+        write_glb(file, meshes, items, colors)
+
+
+def _matrix(loc: "Location | None") -> list[list[float]]:
+    if loc is None:
+        return [[float(r == c) for c in range(4)] for r in range(3)]
+
+    trsf = loc.wrapped.Transformation()
+    return [[trsf.Value(r, c) for c in range(1, 5)] for r in range(1, 4)]
+
+
+def _export_plate_step(plate: Plate, file: str):
+    from someline.step import write_assembly  # pylint: disable=C0415
+
+    # Each distinct model is written once and placed as assembly instances.
+    parts = {model.name: model.part for model, _ in plate.placements}
+    items = [(model.name, loc) for model, loc in plate.placements]
+
+    os.makedirs(os.path.dirname(file), exist_ok=True)
+    with profiler.span(os.path.basename(file), "step"):
+        write_assembly(file, plate.name, parts, items)
+
 
+def _export_step(shape: "Shape", file: str):
+    from someline.step import write_shape  # pylint: disable=C0415
 
-def _export_step(shape: Shape, file: str):
     os.makedirs(os.path.dirname(file), exist_ok=True)
-    export_step(shape, file, timestamp="0000-00-00T00:00:00")
+    with profiler.span(os.path.basename(file), "step"):
+        write_shape(file, shape)
@@ -0,0 +1,78 @@
+# pylint: disable=missing-docstring
+
+
+import hashlib
+import json
+import math
+import os
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from someline.util import Model
+
+# Relative tolerance when comparing measures, e.g. for different OCCT
+# versions or parts read from the part cache.
+REL_TOL = 1e-6
+
+
+def measure(model: "Model") -> dict:
+    """
+    Return cheap geometric measures of a model, including a hash of its
+    triangulation as written to STL files.
+    """
+    part = model.part
+    bb = model.bounding_box()
+    mesh = model.mesh
+
+    h = hashlib.sha256()
+    h.update(mesh.vertices.astype("<f4").tobytes())
+    h.update(mesh.triangles.astype("<u4").tobytes())
+
+    return {
+        "volume": _round(model.volume),
+        "area": _round(part.area),
+        "bbox": [_round(v) for v in (*bb.min, *bb.max)],
+        "faces": len(part.faces()),
+        "edges": len(part.edges()),
+        "mesh": h.hexdigest(),
+    }
+
+
+def _round(value: float) -> float:
+    # Adding zero turns negative zero into zero
+    return round(value, 6) + 0.0
+
+
+def compare(expected: dict, actual: dict) -> list[str]:
+    errors = []
+    for key, value in expected.items():
+        other = actual.get(key)
+        if isinstance(value, float):
+            equal = math.isclose(value, other, rel_tol=REL_TOL, abs_tol=REL_TOL)
+        elif isinstance(value, list):
+            equal = len(value) == len(other) and all(
+                math.isclose(a, b, rel_tol=REL_TOL, abs_tol=REL_TOL)
+                for a, b in zip(value, other)
+            )
+        else:
+            equal = value == other
+
+        if not equal:
+            errors.append(f"{key}: {value} != {other}")
+
+    return errors
+
+
+def load(file: str) -> dict[str, dict]:
+    if not os.path.exists(file):
+        return {}
+    with open(file, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save(file: str, fingerprints: dict[str, dict]):
+    os.makedirs(os.path.dirname(file) or ".", exist_ok=True)
+    with open(f"{file}.tmp", "w", encoding="utf-8") as f:
+        json.dump(fingerprints, f, indent=2, sort_keys=True)
+        f.write("\n")
+    os.replace(f"{file}.tmp", file)